@@ -0,0 +1,51 @@
+"""Check that a solver worker whose timeout fired is never reused.
+
+Run from SortResort/:  python _test_solver_worker_timeout.py
+"""
+import glob
+
+import reverse_generator as rg
+
+with open(sorted(glob.glob("Assets/_Project/Resources/Data/Levels/Island/level_*.json"))[-1], "rb") as f:
+    payload = rg._compact_json_bytes(rg.json.loads(f.read()))
+
+# Timeout during the solve: reported as a timeout, worker not pooled
+rg._close_solver_workers()
+rg.SOLVER_TIMEOUT_S = 0.001
+result = rg._solve_level_subprocess(payload)
+assert not result.solved and result.failure_reason == "Solver subprocess timed out", result.failure_reason
+assert not rg._idle_solver_workers, "timed-out worker was returned to the idle pool"
+rg.SOLVER_TIMEOUT_S = 120
+
+# Timer firing just after the result was read: result discarded, worker dead
+worker = rg._SolverWorker(rg.os.path.dirname(rg.os.path.abspath(rg.__file__)))
+stdout_read = worker.proc.stdout.read
+reads = []
+
+
+def read_then_time_out(n):
+    data = stdout_read(n)
+    reads.append(n)
+    if len(reads) == 2:  # header and body are both in hand
+        worker._kill_on_timeout()
+    return data
+
+
+worker.proc.stdout.read = read_then_time_out
+assert worker.solve(payload) is None, "result of a killed worker was used"
+assert worker.timed_out
+worker.failure()
+
+# Timer firing after the solve finished: no effect
+worker = rg._SolverWorker(rg.os.path.dirname(rg.os.path.abspath(rg.__file__)))
+assert worker.solve(payload) is not None
+worker._kill_on_timeout()
+assert not worker.timed_out and worker.proc.poll() is None
+assert worker.solve(payload) is not None
+worker.close()
+
+# Healthy solve: worker goes back to the pool
+result = rg._solve_level_subprocess(payload)
+assert result.solved and len(rg._idle_solver_workers) == 1
+
+print("OK")
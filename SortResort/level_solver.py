@@ -12,10 +12,17 @@ The two implementations must stay in sync to produce identical results.
 """
 
 import copy
-import gc
+import functools
+import heapq
+import itertools
+import multiprocessing
+import os
 import random
+import sys
 import time
 import threading
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Tuple
 
@@ -23,7 +30,12 @@ from typing import List, Optional, Dict, Tuple
 # ── Data Structures ──────────────────────────────────────────────────────────
 
 class ContainerState:
-    """State of a container during solving. slots[slot_idx][row_idx] = item_id or None."""
+    """State of a container during solving.
+
+    Cells live in one flat row-major list: slots[row * slot_count + slot] =
+    item_id or None. The front row is the prefix slots[:slot_count], so
+    front-row scans are slice operations and clone() is a single list copy.
+    """
 
     def __init__(self, cid, slot_count, max_rows, is_locked=False,
                  unlock_matches_required=0):
@@ -33,67 +45,47 @@ class ContainerState:
         self.is_locked = is_locked
         self.unlock_matches_required = unlock_matches_required
         self.current_unlock_progress = 0
-        # slots[s][r] = item_id or None
-        self.slots = [[None] * max_rows for _ in range(slot_count)]
+        # slots[r * slot_count + s] = item_id or None
+        self.slots = [None] * (slot_count * max_rows)
 
     def clone(self):
         c = ContainerState(self.id, self.slot_count, self.max_rows,
                            self.is_locked, self.unlock_matches_required)
         c.current_unlock_progress = self.current_unlock_progress
-        c.slots = [list(s) for s in self.slots]
+        c.slots = self.slots[:]
         return c
 
     def get_front_item(self, slot_idx):
-        if 0 <= slot_idx < len(self.slots):
-            return self.slots[slot_idx][0]
+        # Bounds-checked; solver loops over range(slot_count) index slots directly
+        if 0 <= slot_idx < self.slot_count:
+            return self.slots[slot_idx]
         return None
 
     def is_front_slot_empty(self, slot_idx):
-        return self.get_front_item(slot_idx) is None
+        return not 0 <= slot_idx < self.slot_count or self.slots[slot_idx] is None
 
     def get_empty_front_slot_count(self):
-        return sum(1 for s in range(self.slot_count) if self.is_front_slot_empty(s))
+        return self.slots[:self.slot_count].count(None)
 
     def get_front_row_items(self):
-        return [self.slots[s][0] for s in range(self.slot_count) if self.slots[s][0] is not None]
+        return [i for i in self.slots[:self.slot_count] if i is not None]
 
     def has_back_row_items(self):
-        for s in self.slots:
-            for r in range(1, len(s)):
-                if s[r] is not None:
-                    return True
-        return False
+        back = self.slots[self.slot_count:]
+        return back.count(None) != len(back)
 
     def get_back_row_item_count(self):
-        count = 0
-        for s in self.slots:
-            for r in range(1, len(s)):
-                if s[r] is not None:
-                    count += 1
-        return count
+        back = self.slots[self.slot_count:]
+        return len(back) - back.count(None)
 
     def get_back_row_item_types(self):
-        items = []
-        for s in self.slots:
-            for r in range(1, len(s)):
-                if s[r] is not None:
-                    items.append(s[r])
-        return items
+        return [i for i in self.slots[self.slot_count:] if i is not None]
 
     def is_empty(self):
-        for s in self.slots:
-            for item in s:
-                if item is not None:
-                    return False
-        return True
+        return self.slots.count(None) == len(self.slots)
 
     def get_total_item_count(self):
-        count = 0
-        for s in self.slots:
-            for item in s:
-                if item is not None:
-                    count += 1
-        return count
+        return len(self.slots) - self.slots.count(None)
 
 
 class GameState:
@@ -103,22 +95,47 @@ class GameState:
         self.containers: List[ContainerState] = []
         self.move_count = 0
         self.match_count = 0
+        # item_id -> {container index: copies in that front row}; every
+        # container index is present (0 when absent) so updates can be
+        # journaled as plain (dict, key, prev) cell writes
+        self.front_index: Dict[str, Dict[int, int]] = {}
+        # Indices of containers that can hold a triple (slot_count >= 3);
+        # slot counts never change during a solve
+        self.matchable: Tuple[int, ...] = ()
 
     def clone(self):
         gs = GameState()
         gs.containers = [c.clone() for c in self.containers]
         gs.move_count = self.move_count
         gs.match_count = self.match_count
+        gs.front_index = {item: dict(counts) for item, counts in self.front_index.items()}
+        gs.matchable = self.matchable
         return gs
 
+    def rebuild_front_index(self):
+        items = {i for c in self.containers for i in c.slots if i is not None}
+        n = len(self.containers)
+        self.front_index = {item: dict.fromkeys(range(n), 0) for item in items}
+        for ci, c in enumerate(self.containers):
+            for item in c.slots[:c.slot_count]:
+                if item is not None:
+                    self.front_index[item][ci] += 1
+
     def get_total_item_count(self):
         return sum(c.get_total_item_count() for c in self.containers)
 
+    def position_key(self):
+        """Hashable snapshot of everything move scoring depends on:
+        every cell, plus unlock progress of still-locked containers."""
+        return (tuple(itertools.chain.from_iterable(c.slots for c in self.containers)),
+                tuple(c.current_unlock_progress if c.is_locked else -1
+                      for c in self.containers))
+
     def is_complete(self):
         return self.get_total_item_count() == 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Move:
     from_container: int
     from_slot: int
@@ -133,7 +150,7 @@ class Move:
                 f"to C[{self.to_container}].S[{self.to_slot}]")
 
 
-@dataclass
+@dataclass(slots=True)
 class SolveResult:
     success: bool = False
     total_moves: int = 0
@@ -143,6 +160,32 @@ class SolveResult:
     solve_time_ms: float = 0.0
 
 
+@dataclass
+class MoveContext:
+    """Board facts shared by every candidate scored in one _find_best_move call.
+    Built once from the current state; candidates only differ by the move."""
+    front_items: List[List[str]]      # per container: non-empty front-row items
+    empty_front: List[int]            # per container: empty front slots
+    back_items: List[List[str]]       # per container: non-empty items behind the front row
+    advance_items: List[List[str]]    # per container: items a row advance would bring forward
+    front_counts: Dict[str, int]      # item_id -> front-row count in unlocked containers
+    total_empty_front: int            # empty front slots across unlocked containers
+    near_unlock_count: int            # locked containers within 2 matches of unlocking
+    max_slot_count: int               # widest container (bounds follow-up reveals)
+    pending_match: bool               # a triple already sits in some front row
+
+
+class _DiscardedReasons(list):
+    """Stand-in for a reasons list when reason strings are not recorded."""
+    __slots__ = ()
+
+    def append(self, reason):
+        pass
+
+
+_NO_REASONS = _DiscardedReasons()
+
+
 @dataclass
 class SolverStrategy:
     """Weight profile for ensemble solving. Defaults reproduce baseline behavior."""
@@ -165,10 +208,13 @@ ALL_STRATEGIES = [BALANCED, PAIR_FOCUSED, REVEAL_FOCUSED, CAUTIOUS, AGGRESSIVE]
 
 MAX_MOVES = 500
 PATTERN_WINDOW = 10
+TRANSPOSITION_LIMIT = 1024  # positions kept in a scoring cache (LRU)
 
 
-def solve_level_best(level_dict, noise_runs_per_strategy=3, noise_magnitude=8, verbose=False):
-    """Solve a level using multiple strategies + noise restarts, return the best result."""
+def solve_level_best(level_dict, noise_runs_per_strategy=3, noise_magnitude=8, verbose=False,
+                     workers=None):
+    """Solve a level using multiple strategies + noise restarts, return the best result.
+    workers: processes for the ensemble runs (default os.cpu_count(); 1 = serial)."""
     start = time.perf_counter()
     best = None
     move_limit = level_dict.get("construction_moves",
@@ -177,38 +223,38 @@ def solve_level_best(level_dict, noise_runs_per_strategy=3, noise_magnitude=8, v
         move_limit = MAX_MOVES
     best_strategy_name = ""
 
-    for strat in ALL_STRATEGIES:
-        # Clean run (no noise)
-        result = solve_level(level_dict, strategy=strat, move_limit=move_limit)
-        if result.success and (best is None or result.total_moves < best.total_moves):
-            best = result
-            move_limit = best.total_moves
-            best_strategy_name = strat.name
-        else:
-            del result
-        gc.collect()
+    tasks = _ensemble_tasks(noise_runs_per_strategy, noise_magnitude)
 
-        # Noise restarts
-        for run in range(1, noise_runs_per_strategy + 1):
-            noise_strat = SolverStrategy(
-                name=f"{strat.name}_n{run}",
-                pair_weight=strat.pair_weight,
-                reveal_weight=strat.reveal_weight,
-                caution_weight=strat.caution_weight,
-                noise_magnitude=noise_magnitude,
-            )
-            result = solve_level(level_dict, strategy=noise_strat, noise_seed=run,
-                                 move_limit=move_limit)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    if workers > 1:
+        # A run that finishes within the limit is unaffected by it, so picking
+        # the first strictly-shorter result in task order matches the serial loop.
+        results = _solve_tasks_parallel(level_dict, tasks, move_limit, workers, verbose)
+        for (strat, _), result in zip(tasks, results):
+            if result.success and (best is None or result.total_moves < best.total_moves):
+                best = result
+                best_strategy_name = strat.name
+    else:
+        # Unweighted candidate scores are strategy-independent, so every run
+        # shares one transposition table: positions reached by several
+        # strategies / noise seeds are scored once.
+        score_cache = OrderedDict()
+        for strat, seed in tasks:
+            result = solve_level(level_dict, strategy=strat, noise_seed=seed,
+                                 move_limit=move_limit, score_cache=score_cache,
+                                 record_reasons=verbose)
             if result.success and (best is None or result.total_moves < best.total_moves):
                 best = result
                 move_limit = best.total_moves
-                best_strategy_name = noise_strat.name
+                best_strategy_name = strat.name
             else:
                 del result
-            gc.collect()
 
     if best is None:
-        best = solve_level(level_dict)
+        best = solve_level(level_dict, record_reasons=verbose)
 
     best.solve_time_ms = (time.perf_counter() - start) * 1000
 
@@ -219,17 +265,73 @@ def solve_level_best(level_dict, noise_runs_per_strategy=3, noise_magnitude=8, v
     return best
 
 
-def solve_level(level_dict, verbose=False, strategy=None, noise_seed=0, move_limit=0):
-    """Solve a level from its JSON dict. Returns SolveResult."""
+@functools.lru_cache(maxsize=None)
+def _ensemble_tasks(noise_runs_per_strategy, noise_magnitude):
+    """(strategy, noise_seed) per ensemble run: each strategy's clean run, then
+    its noise restarts. Built once per configuration; strategies are read-only."""
+    tasks = []
+    for strat in ALL_STRATEGIES:
+        tasks.append((strat, 0))
+        for run in range(1, noise_runs_per_strategy + 1):
+            noise_strat = SolverStrategy(
+                name=f"{strat.name}_n{run}",
+                pair_weight=strat.pair_weight,
+                reveal_weight=strat.reveal_weight,
+                caution_weight=strat.caution_weight,
+                noise_magnitude=noise_magnitude,
+            )
+            tasks.append((noise_strat, run))
+    return tuple(tasks)
+
+
+_shared_move_limit = None  # per-worker handle to the ensemble's best-so-far move count
+
+
+def _init_solve_worker(shared_limit):
+    global _shared_move_limit
+    _shared_move_limit = shared_limit
+
+
+def _solve_task(level_dict, strategy, noise_seed, record_reasons):
+    """Worker entry point: one ensemble run, pruned by the best result so far."""
+    return solve_level(level_dict, strategy=strategy, noise_seed=noise_seed,
+                       move_limit=_shared_move_limit.value, record_reasons=record_reasons)
+
+
+def _solve_tasks_parallel(level_dict, tasks, move_limit, workers, record_reasons):
+    """Run (strategy, noise_seed) tasks in a process pool. Returns results in task order."""
+    shared_limit = multiprocessing.Value("i", move_limit)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_solve_worker,
+                             initargs=(shared_limit,)) as pool:
+        futures = [pool.submit(_solve_task, level_dict, strat, seed, record_reasons)
+                   for strat, seed in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.success:
+                with shared_limit.get_lock():
+                    if result.total_moves < shared_limit.value:
+                        shared_limit.value = result.total_moves
+        return [f.result() for f in futures]
+
+
+def solve_level(level_dict, verbose=False, strategy=None, noise_seed=0, move_limit=0,
+                score_cache=None, record_reasons=None):
+    """Solve a level from its JSON dict. Returns SolveResult.
+    score_cache: optional transposition table (OrderedDict) shared between
+    solves of the same level; a private one is used when omitted.
+    record_reasons: build Move.reason strings (defaults to verbose); when off,
+    reasons are left empty and scoring skips the string work."""
     start = time.perf_counter()
+    if record_reasons is None:
+        record_reasons = verbose
     result = SolveResult()
 
     effective_limit = move_limit if move_limit > 0 else MAX_MOVES
 
     # Set up noise RNG
-    noise_rng = None
+    noise_draw = None
     if strategy and strategy.noise_magnitude > 0:
-        noise_rng = random.Random(noise_seed)
+        noise_draw = _noise_source(random.Random(noise_seed), strategy.noise_magnitude)
 
     state = _initialize_state(level_dict)
     if state is None:
@@ -241,11 +343,31 @@ def solve_level(level_dict, verbose=False, strategy=None, noise_seed=0, move_lim
     _process_all_matches(state)
 
     last_move = None
-    recent_moves = []
+    recent_moves = deque(maxlen=PATTERN_WINDOW)
+    recent_keys = Counter()  # pattern keys of recent_moves, kept in sync on push/evict
+    if score_cache is None:
+        score_cache = OrderedDict()
+
+    # Without noise the next move is a pure function of the position and the
+    # recent-move window. If that pair repeats, the solver is cycling: no
+    # match happens inside the cycle (matches remove items), so it would
+    # replay the same moves until the limit. Decision key -> move index.
+    seen_decisions = {} if noise_draw is None else None
 
     while not state.is_complete() and state.move_count < effective_limit:
-        best = _find_best_move(state, last_move, recent_moves, verbose,
-                               strategy=strategy, noise_rng=noise_rng)
+        if seen_decisions is not None:
+            decision_key = (state.position_key(), tuple(map(_pattern_key, recent_moves)))
+            cycle_start = seen_decisions.setdefault(decision_key, len(result.move_sequence))
+            if cycle_start < len(result.move_sequence):
+                cycle = result.move_sequence[cycle_start:]
+                for i in range(effective_limit - state.move_count):
+                    result.move_sequence.append(copy.copy(cycle[i % len(cycle)]))
+                state.move_count = effective_limit
+                break
+
+        best = _find_best_move(state, last_move, recent_keys, verbose,
+                               strategy=strategy, noise_draw=noise_draw,
+                               score_cache=score_cache, record_reasons=record_reasons)
 
         if best is None:
             result.failure_reason = f"No valid moves. {state.get_total_item_count()} items remaining."
@@ -258,14 +380,20 @@ def solve_level(level_dict, verbose=False, strategy=None, noise_seed=0, move_lim
         result.move_sequence.append(best)
         last_move = best
 
+        if len(recent_moves) == PATTERN_WINDOW:
+            evicted = _pattern_key(recent_moves[0])
+            recent_keys[evicted] -= 1
+            if not recent_keys[evicted]:
+                del recent_keys[evicted]
         recent_moves.append(best)
-        if len(recent_moves) > PATTERN_WINDOW:
-            recent_moves.pop(0)
+        recent_keys[_pattern_key(best)] += 1
 
-        new_matches = _process_all_matches(state)
+        new_matches = _process_all_matches(
+            state, dirty=(best.from_container, best.to_container))
         if new_matches > 0:
             last_move = None
             recent_moves.clear()
+            recent_keys.clear()
 
     if state.is_complete():
         result.success = True
@@ -307,18 +435,23 @@ def _initialize_state(level_dict):
             s = item.get("slot", 0)
             r = item.get("row", 0)
             if 0 <= s < slot_count and 0 <= r < max_rows:
-                c.slots[s][r] = item.get("id")
+                item_id = item.get("id")
+                # Intern ids: the solver compares item ids with `is` downstream
+                c.slots[r * slot_count + s] = sys.intern(item_id) if item_id is not None else None
 
         state.containers.append(c)
 
+    state.matchable = tuple(ci for ci, c in enumerate(state.containers) if c.slot_count >= 3)
+    state.rebuild_front_index()
     return state
 
 
 # ── Move Finding ─────────────────────────────────────────────────────────────
 
-def _find_best_move(state, last_move, recent_moves, verbose=False,
-                    strategy=None, noise_rng=None):
-    """Find the best move using greedy heuristics."""
+def _find_best_move(state, last_move, recent_keys, verbose=False,
+                    strategy=None, noise_draw=None, score_cache=None, record_reasons=True):
+    """Find the best move using greedy heuristics.
+    score_cache maps GameState.position_key() -> unweighted candidate scores."""
     # RULE 1: Always take 1-move matches
     one_move = _find_one_move_match(state)
     if one_move is not None:
@@ -326,101 +459,231 @@ def _find_best_move(state, last_move, recent_moves, verbose=False,
         one_move.reason = "1-move match (always taken)"
         return one_move
 
-    # RULE 2: Analyze item accessibility
-    item_status = _analyze_item_accessibility(state)
-
-    # RULE 3: Get all valid moves
+    # RULE 2: Get all valid moves
     all_moves = _get_all_valid_moves(state)
     if not all_moves:
         return None
 
-    # Build recent move pattern set
-    recent_set = set()
-    if recent_moves:
-        for rm in recent_moves:
-            recent_set.add(f"{rm.item_id}:{rm.from_container}->{rm.to_container}")
-
-    # RULE 4: Score all moves
-    scored = []
-    for move in all_moves:
-        score, reason = _score_move_unified(state, move, item_status, strategy=strategy)
+    # RULE 3: Score every candidate without the follow-up probe, keeping an
+    # upper bound on what the probe could add. Reused from the transposition
+    # table when this position was already scored (candidate order is
+    # deterministic); probed scores are filled in lazily.
+    key = (record_reasons, state.position_key()) if score_cache is not None else None
+    entry = score_cache.get(key) if key is not None else None
+    if entry is not None:
+        score_cache.move_to_end(key)
+    else:
+        item_status = _analyze_item_accessibility(state)
+        ctx = _build_move_context(state)
+        bounded = [_score_move_components(state, move, item_status, ctx, record_reasons,
+                                          probe_follow_up=False)
+                   for move in all_moves]
+        exact = [c if c[5] is None else None for c in bounded]
+        entry = (item_status, ctx, bounded, exact)
+        if key is not None:
+            score_cache[key] = entry
+            if len(score_cache) > TRANSPOSITION_LIMIT:
+                score_cache.popitem(last=False)
+    item_status, ctx, bounded, exact = entry
+
+    # The probe bound only holds for non-negative strategy weights
+    can_prune = strategy is None or min(strategy.pair_weight, strategy.reveal_weight,
+                                        strategy.caution_weight) >= 0
+
+    # RULE 4: Per-candidate adjustments; noise is drawn in candidate order
+    noises = noise_draw(len(all_moves)) if noise_draw is not None else None
+    adjustments = []
+    suffixes = []
+    bounds = []
+    for i, (move, move_components) in enumerate(zip(all_moves, bounded)):
+        adjustment = 0
+        suffix = ""
 
         # RULE 5: Reversal penalty
         if last_move and _is_reversal_move(move, last_move):
-            score -= 1000
-            reason += ", REVERSAL PENALTY"
+            adjustment -= 1000
+            if record_reasons:
+                suffix += ", REVERSAL PENALTY"
 
         # RULE 6: Pattern penalty
-        reverse_key = f"{move.item_id}:{move.to_container}->{move.from_container}"
-        if reverse_key in recent_set:
-            score -= 500
-            reason += ", PATTERN PENALTY"
+        if (move.item_id, move.to_container, move.from_container) in recent_keys:
+            adjustment -= 500
+            if record_reasons:
+                suffix += ", PATTERN PENALTY"
 
         # Apply noise for ensemble diversity
-        if noise_rng is not None and strategy and strategy.noise_magnitude > 0:
-            noise = noise_rng.randint(-strategy.noise_magnitude, strategy.noise_magnitude)
-            score += noise
-
-        scored.append((score, move, reason))
-
-    scored.sort(key=lambda x: -x[0])
-
-    best_score, best_move, best_reason = scored[0]
+        if noises is not None:
+            adjustment += noises[i]
+
+        adjustments.append(adjustment)
+        suffixes.append(suffix)
+        bound = _weighted_score(move_components, strategy)[0] + adjustment
+        probe_gain = move_components[5]
+        if probe_gain is not None:
+            bound = bound + _probe_gain_bound(probe_gain, strategy) if can_prune else float("inf")
+        bounds.append(bound)
+
+    # RULE 7: Probe candidates from the highest bound down and stop once no
+    # bound can beat the best exact score. Ties keep the earliest candidate.
+    # Candidates are popped lazily from a heap: the loop usually stops after a
+    # few, so fully sorting all bounds is wasted work. (-bound, index) pops
+    # equal bounds in candidate order.
+    order = [(-bound, i) for i, bound in enumerate(bounds)]
+    heapq.heapify(order)
+    best_index = -1
+    best_score = 0
+    best_reason = ""
+    while order:
+        i = heapq.heappop(order)[1]
+        if best_index >= 0:
+            if bounds[i] < best_score:
+                break
+            if bounds[i] == best_score and i > best_index:
+                continue
+        move_components = exact[i]
+        if move_components is None:
+            move_components = exact[i] = _resolve_follow_up_probe(
+                state, all_moves[i], bounded[i], item_status, ctx, record_reasons)
+        score, reason = _weighted_score(move_components, strategy)
+        score += adjustments[i]
+        if (best_index < 0 or score > best_score
+                or (score == best_score and i < best_index)):
+            best_index = i
+            best_score = score
+            best_reason = reason + suffixes[i]
+
+    best_move = all_moves[best_index]
     best_move.score = best_score
     best_move.reason = best_reason
     return best_move
 
 
+def _noise_source(rng, magnitude):
+    """Batch drawer for score noise: draw(count) returns the values of count
+    successive rng.randint(-magnitude, magnitude) calls (same stream), with
+    randint's argument handling done once instead of per draw."""
+    width = 2 * magnitude + 1
+    bits = width.bit_length()
+    getrandbits = rng.getrandbits
+
+    def draw(count):
+        values = []
+        for _ in range(count):
+            r = getrandbits(bits)
+            while r >= width:
+                r = getrandbits(bits)
+            values.append(r - magnitude)
+        return values
+
+    return draw
+
+
 # ── Item Accessibility ───────────────────────────────────────────────────────
 
 def _analyze_item_accessibility(state):
     """Classify each item type: (accessible, nearly_accessible, total)."""
-    result = {}  # item_id -> (accessible, nearly, total)
+    # Per-row tallies via Counter.update over flat-row slices; None is
+    # counted along with items and dropped at the end.
+    total = Counter()
+    accessible = Counter()
+    nearly = Counter()
 
-    # Containers close to unlocking
-    near_unlock = set()
-    for ci, c in enumerate(state.containers):
-        if c.is_locked and c.unlock_matches_required - c.current_unlock_progress <= 2:
-            near_unlock.add(ci)
+    for c in state.containers:
+        slots = c.slots
+        slot_count = c.slot_count
+        total.update(slots)
+        front = slots[:slot_count]
+        if not c.is_locked:
+            accessible.update(front)
+            # Close to row advance: the second row comes forward next
+            if slot_count - front.count(None) <= 1 and c.has_back_row_items():
+                nearly.update(slots[slot_count:2 * slot_count])
+        elif c.unlock_matches_required - c.current_unlock_progress <= 2:
+            # Close to unlocking
+            nearly.update(front)
 
-    # Containers close to row advance
-    near_advance = set()
-    for ci, c in enumerate(state.containers):
-        if c.is_locked:
-            continue
-        occupied = sum(1 for s in range(c.slot_count) if not c.is_front_slot_empty(s))
-        if occupied <= 1 and c.has_back_row_items():
-            near_advance.add(ci)
-
-    for ci, container in enumerate(state.containers):
-        for s in range(container.slot_count):
-            for r in range(len(container.slots[s])):
-                item_id = container.slots[s][r]
-                if item_id is None:
-                    continue
+    del total[None]
+    return {item_id: (accessible[item_id], nearly[item_id], count)
+            for item_id, count in total.items()}
 
-                if item_id not in result:
-                    result[item_id] = [0, 0, 0]
 
-                current = result[item_id]
-                current[2] += 1  # total
+# ── Move Scoring ─────────────────────────────────────────────────────────────
 
-                if r == 0 and not container.is_locked:
-                    current[0] += 1  # accessible
-                elif r == 0 and ci in near_unlock:
-                    current[1] += 1  # nearly accessible
-                elif r == 1 and ci in near_advance:
-                    current[1] += 1  # nearly accessible
+def _build_move_context(state):
+    """Precompute the per-container front-row facts the scorer reads for every candidate."""
+    front_items = []
+    empty_front = []
+    back_items = []
+    advance_items = []
+    front_counts = {}
+    total_empty_front = 0
+    near_unlock_count = 0
+    max_slot_count = 0
+    for c in state.containers:
+        max_slot_count = max(max_slot_count, c.slot_count)
+        items = c.get_front_row_items()
+        empty = c.slot_count - len(items)
+        front_items.append(items)
+        empty_front.append(empty)
+        back = c.get_back_row_item_types()
+        back_items.append(back)
+        advance_items.append(_get_items_that_would_advance(c) if back else [])
+        if c.is_locked:
+            if c.unlock_matches_required - c.current_unlock_progress <= 2:
+                near_unlock_count += 1
+            continue
+        total_empty_front += empty
+        for item in items:
+            front_counts[item] = front_counts.get(item, 0) + 1
+    return MoveContext(front_items, empty_front, back_items, advance_items, front_counts,
+                       total_empty_front, near_unlock_count, max_slot_count,
+                       _would_match(state))
 
-    return {k: tuple(v) for k, v in result.items()}
 
+def _weighted_score(components, strategy):
+    """Apply strategy weights to _score_move_components output."""
+    score, pair_contrib, reveal_contrib, penalty_contrib, reason, _ = components
+    if strategy is not None:
+        score += int(pair_contrib * (strategy.pair_weight - 1.0))
+        score += int(reveal_contrib * (strategy.reveal_weight - 1.0))
+        score += int(penalty_contrib * (strategy.caution_weight - 1.0))
+    return score, reason
 
-# ── Move Scoring ─────────────────────────────────────────────────────────────
 
-def _score_move_unified(state, move, item_status, strategy=None):
-    """Score a move on a unified scale. Returns (score, reason_string)."""
+def _probe_gain_bound(probe_gain, strategy):
+    """Upper bound on how much the skipped follow-up probe could raise a
+    weighted score, given the per-category gains from _score_move_components."""
+    score_gain, pair_gain, reveal_gain, penalty_gain = probe_gain
+    if strategy is None:
+        return score_gain + pair_gain + reveal_gain + penalty_gain
+    # +2 per weighted category covers int() truncation on both sides
+    return (score_gain + pair_gain * strategy.pair_weight
+            + reveal_gain * strategy.reveal_weight
+            + penalty_gain * strategy.caution_weight + 6)
+
+
+def _resolve_follow_up_probe(state, move, components, item_status, ctx, record_reasons):
+    """Exact components for a move scored with probe_follow_up off. The common
+    case (no 1-move match after the move) leaves the cheap score unchanged."""
+    journal = _apply_move(state, move)
+    follow_up = _find_one_move_match(state)
+    _undo(journal)
+    if follow_up is None:
+        return components[:5] + (None,)
+    return _score_move_components(state, move, item_status, ctx, record_reasons)
+
+
+def _score_move_components(state, move, item_status, ctx, record_reasons=True,
+                           probe_follow_up=True):
+    """Strategy-independent move score.
+    Returns (score, pair_contrib, reveal_contrib, penalty_contrib, reason_string,
+    probe_gain); reason_string is "" when record_reasons is off.
+    With probe_follow_up off, the 1-move-match search on the post-move board is
+    skipped and scored as finding nothing; probe_gain is then the most each
+    category (score-only, pair, reveal, penalty) could gain from it. probe_gain
+    is None when the result is exact."""
     score = 0
-    reasons = []
+    reasons = [] if record_reasons else _NO_REASONS
 
     # Category subtotals for strategy weight adjustments
     pair_contrib = 0
@@ -428,40 +691,52 @@ def _score_move_unified(state, move, item_status, strategy=None):
     penalty_contrib = 0
 
     from_c = state.containers[move.from_container]
-    to_c = state.containers[move.to_container]
 
     # Item accessibility
     acc, near, total = item_status.get(move.item_id, (0, 0, 0))
     is_actionable = (acc + near) >= 2
 
     # Destination info
-    dest_items = to_c.get_front_row_items()
-    matching_at_dest = sum(1 for i in dest_items if i == move.item_id)
+    dest_items = ctx.front_items[move.to_container]
+    matching_at_dest = dest_items.count(move.item_id)
 
     # === MATCH-ENABLING BONUSES ===
-    test_state = state.clone()
-    _execute_move(test_state, move)
-
-    if _would_match(test_state):
+    # Probe the post-move position in place: every write is journaled and
+    # reverted before scoring continues, so `state` is never cloned.
+    move_journal = _apply_move(state, move)
+
+    # Without a triple already on the board, only the two containers the
+    # move touched can have formed one
+    if ctx.pending_match:
+        creates_match = _would_match(state)
+    else:
+        creates_match = (_front_is_triple(state, move.from_container)
+                         or _front_is_triple(state, move.to_container))
+    follow_up = None
+    enables_with_pair = False
+    enables_temp = False
+    if creates_match:
         score += 200
         reasons.append("creates match")
-    else:
-        follow_up = _find_one_move_match(test_state)
+    elif probe_follow_up:
+        follow_up = _find_one_move_match(state)
         if follow_up is not None:
             if matching_at_dest >= 1:
                 score += 120
+                enables_with_pair = True
                 reasons.append("enables match + creates pair")
             elif len(dest_items) == 0:
                 score += 80
                 reasons.append("enables match (to empty)")
             else:
                 score += 40
+                enables_temp = True
                 reasons.append("enables match (temp location)")
 
             # Follow-up quality: evaluate how good the enabled match is
-            fu_from_c = test_state.containers[follow_up.from_container]
-            fu_from_occ = sum(1 for s in range(fu_from_c.slot_count)
-                              if not fu_from_c.is_front_slot_empty(s))
+            fu_from_c = state.containers[follow_up.from_container]
+            fu_from_occ = (fu_from_c.slot_count
+                           - fu_from_c.slots[:fu_from_c.slot_count].count(None))
 
             # Bonus if the follow-up move triggers row advance at its source
             if fu_from_occ == 1 and fu_from_c.has_back_row_items():
@@ -471,23 +746,38 @@ def _score_move_unified(state, move, item_status, strategy=None):
                 reasons.append(f"follow-up reveals {len(revealed_by_fu)} items")
 
             # Check if follow-up creates chain matches
-            fu_state = test_state.clone()
-            _execute_move(fu_state, follow_up)
-            _process_all_matches(fu_state)
-
-            chain_match = _find_one_move_match(fu_state)
+            fu_journal = _apply_move(state, follow_up)
+            _process_all_matches(state, fu_journal,
+                                 None if ctx.pending_match else
+                                 (move.from_container, move.to_container,
+                                  follow_up.from_container, follow_up.to_container))
+
+            chain_match = _find_one_move_match(state)
+            _undo(fu_journal)
             if chain_match is not None:
                 score += 15; reveal_contrib += 15
                 reasons.append("follow-up chains into match")
 
+    _undo(move_journal)
+
+    # Pre-move facts about the source and destination, from the shared context
+    from_empty_front = ctx.empty_front[move.from_container]
+    from_has_back = bool(ctx.back_items[move.from_container])
+    to_back_items = ctx.back_items[move.to_container]
+
+    # Items the source's row advance would bring to the front row
+    from_advances = from_empty_front == from_c.slot_count - 1 and from_has_back
+    advanced = ctx.advance_items[move.from_container] if from_advances else []
+
     # === PAIRING BONUS ===
-    already_credited_pair = "enables match + creates pair" in reasons
+    already_credited_pair = enables_with_pair
     pair_room_will_open = False
+    pair_before_pairing = pair_contrib
 
     if matching_at_dest == 1 and not already_credited_pair:
         third_accessible = acc >= 3
         third_nearly = (acc + near) >= 3
-        empty_at_dest = to_c.get_empty_front_slot_count()
+        empty_at_dest = ctx.empty_front[move.to_container]
         has_room_for_third = empty_at_dest >= 2
 
         if third_accessible and has_room_for_third:
@@ -497,7 +787,7 @@ def _score_move_unified(state, move, item_status, strategy=None):
             score -= 50; pair_contrib -= 50
             reasons.append("creates BLOCKED pair (no room for 3rd)")
         elif third_nearly and has_room_for_third:
-            hidden_at_dest = to_c.get_back_row_item_types()
+            hidden_at_dest = to_back_items
             if move.item_id in hidden_at_dest:
                 score -= 200; pair_contrib -= 200
                 reasons.append("SELF-BLOCKING pair (3rd hidden HERE)")
@@ -507,15 +797,16 @@ def _score_move_unified(state, move, item_status, strategy=None):
         elif not third_accessible and has_room_for_third:
             score += 20; pair_contrib += 20
             reasons.append("creates waiting pair (3rd hidden)")
-            if to_c.has_back_row_items():
+            if to_back_items:
                 score -= 80; pair_contrib -= 80
                 reasons.append("pair blocks reveals")
         else:
             # WORST PAIR: 3rd hidden AND no room
-            non_matching = set(i for i in dest_items if i != move.item_id)
+            # Blocking types must have 3 accessible after the move; only the
+            # source's row advance changes their front-row counts.
+            non_matching = set(dest_items) - {move.item_id}
             room_will_open = bool(non_matching) and all(
-                sum(1 for c2 in test_state.containers if not c2.is_locked
-                    for fi in c2.get_front_row_items() if fi == item_type) >= 3
+                ctx.front_counts.get(item_type, 0) + advanced.count(item_type) >= 3
                 for item_type in non_matching
             )
 
@@ -527,35 +818,38 @@ def _score_move_unified(state, move, item_status, strategy=None):
                 score -= 100; pair_contrib -= 100
                 reasons.append("creates useless pair (hidden + blocked)")
 
-    elif matching_at_dest == 0 and len(dest_items) > 0 and "enables match (temp location)" not in reasons:
+    elif matching_at_dest == 0 and len(dest_items) > 0 and not enables_temp:
         score -= 10; penalty_contrib -= 10
         reasons.append("mixes items")
+    pairing_contrib = pair_contrib - pair_before_pairing
 
     # === SELF-BLOCKING PAIR PENALTY (enables-match path) ===
     if matching_at_dest >= 1 and already_credited_pair:
-        hidden_at_dest = to_c.get_back_row_item_types()
+        hidden_at_dest = to_back_items
         if move.item_id in hidden_at_dest:
             score -= 200; pair_contrib -= 200
             reasons.append("SELF-BLOCKING pair (3rd hidden HERE)")
 
     # === ACTIONABILITY ===
+    stuck_penalty = 0
     if is_actionable:
         score += 30
         reasons.append("actionable item")
     else:
-        has_useful = any(r.startswith("creates match") or r.startswith("enables match") or
-                         r == "creates pair" for r in reasons)
+        # "creates match" / "enables match ..." reasons
+        has_useful = creates_match or follow_up is not None
         if not has_useful:
             score -= 40; penalty_contrib -= 40
             reasons.append("stuck item shuffle")
+            stuck_penalty = 40
 
     # === PAIR DESTRUCTION PENALTY ===
-    source_items = from_c.get_front_row_items()
-    matching_at_source = sum(1 for i in source_items if i == move.item_id)
+    source_items = ctx.front_items[move.from_container]
+    matching_at_source = source_items.count(move.item_id)
     if matching_at_source == 2:
         completing_triple = matching_at_dest == 2
         if not completing_triple:
-            source_empty = from_c.get_empty_front_slot_count()
+            source_empty = from_empty_front
             has_room = source_empty >= 1
             third_acc = acc >= 3
             if third_acc and has_room:
@@ -566,10 +860,10 @@ def _score_move_unified(state, move, item_status, strategy=None):
                 reasons.append("breaks blocked pair")
 
     # === ROW ADVANCEMENT BONUS ===
-    from_occupied = sum(1 for s in range(from_c.slot_count) if not from_c.is_front_slot_empty(s))
+    from_occupied = from_c.slot_count - from_empty_front
 
-    if from_occupied == 1 and from_c.has_back_row_items():
-        revealed = _get_items_that_would_advance(from_c)
+    if from_occupied == 1 and from_has_back:
+        revealed = ctx.advance_items[move.from_container]
         row_adv_bonus = 100 + len(revealed) * 25
         score += row_adv_bonus; reveal_contrib += row_adv_bonus
         reasons.append(f"triggers row advance ({len(revealed)} items)")
@@ -588,16 +882,16 @@ def _score_move_unified(state, move, item_status, strategy=None):
             score += 50; reveal_contrib += 50
             reasons.append("combo: near-pair + reveal")
 
-    elif from_c.has_back_row_items():
-        back_count = from_c.get_back_row_item_count()
+    elif from_has_back:
+        back_count = len(ctx.back_items[move.from_container])
         progress_bonus = 30 + back_count * 10
         score += progress_bonus; reveal_contrib += progress_bonus
         reasons.append(f"progress toward reveal ({back_count} hidden)")
 
     # === SOURCE PAIR BONUS (Double-Pair Recognition) ===
     # When row advance reveals a pair at source
-    if from_occupied == 1 and from_c.has_back_row_items():
-        revealed_for_pair = _get_items_that_would_advance(from_c)
+    if from_occupied == 1 and from_has_back:
+        revealed_for_pair = ctx.advance_items[move.from_container]
         revealed_counts = {}
         for ri in revealed_for_pair:
             revealed_counts[ri] = revealed_counts.get(ri, 0) + 1
@@ -609,8 +903,7 @@ def _score_move_unified(state, move, item_status, strategy=None):
     elif from_occupied > 1:
         # Check if remaining front items at source form a pair
         remaining_counts = {}
-        for s in range(from_c.slot_count):
-            fi = from_c.get_front_item(s)
+        for s, fi in enumerate(from_c.slots[:from_c.slot_count]):
             if fi is not None and s != move.from_slot:
                 remaining_counts[fi] = remaining_counts.get(fi, 0) + 1
         for ri_type, ri_cnt in remaining_counts.items():
@@ -620,25 +913,23 @@ def _score_move_unified(state, move, item_status, strategy=None):
                 break
 
     # === DESTINATION QUALITY ===
-    dest_empty = to_c.get_empty_front_slot_count()
+    dest_empty = ctx.empty_front[move.to_container]
     if dest_empty <= 1 and not pair_room_will_open:
         score -= 15; penalty_contrib -= 15
         reasons.append("fills container")
 
     # === DEADLOCK PREVENTION ===
-    # Check if this move would leave dangerously few empty front slots globally
-    deadlock_test = test_state.clone()
-    matches_from_move = _process_all_matches(deadlock_test)
-    total_empty_slots = 0
-    for c in deadlock_test.containers:
-        if not c.is_locked:
-            total_empty_slots += c.get_empty_front_slot_count()
-
-    # Count containers about to unlock (within 2 matches)
-    near_unlock_count = sum(1 for c in deadlock_test.containers
-                            if c.is_locked and c.unlock_matches_required - c.current_unlock_progress <= 2)
+    # Check if this move would leave dangerously few empty front slots globally.
+    # Without a match the only changes are the source/dest front rows.
+    if not creates_match:
+        if from_advances:
+            from_empty_after = from_c.slot_count - len(advanced)
+        else:
+            from_empty_after = from_empty_front + 1
+        total_empty_slots = (ctx.total_empty_front - 1
+                             - from_empty_front + from_empty_after)
+        near_unlock_count = ctx.near_unlock_count
 
-    if matches_from_move == 0:
         if total_empty_slots == 0 and near_unlock_count == 0:
             score -= 500; penalty_contrib -= 500
             reasons.append("DEADLOCK: leaves 0 empty slots")
@@ -654,7 +945,7 @@ def _score_move_unified(state, move, item_status, strategy=None):
 
     # === STAGING MOVE ===
     if len(dest_items) == 0 and matching_at_dest == 0:
-        if from_occupied == 1 and from_c.has_back_row_items():
+        if from_occupied == 1 and from_has_back:
             score += 20
             reasons.append("productive staging")
         else:
@@ -663,35 +954,43 @@ def _score_move_unified(state, move, item_status, strategy=None):
             reasons.append("staging move")
 
     # === MATCH-IN-PLACE CONSIDERATION ===
-    from_empty = from_c.get_empty_front_slot_count()
+    from_empty = from_empty_front
     making_good_pair = matching_at_dest == 1 and acc >= 3
-    triggering_reveal = from_occupied == 1 and from_c.has_back_row_items()
+    triggering_reveal = from_occupied == 1 and from_has_back
     if from_empty >= 2 and is_actionable and matching_at_dest == 0 and not triggering_reveal:
         score -= 35; penalty_contrib -= 35
         reasons.append("disrupts match-in-place potential")
 
     # === MATCH-AT-REVEALING-CONTAINER BONUS ===
     will_complete = matching_at_dest >= 2 or (matching_at_dest == 1 and acc >= 3)
-    if to_c.has_back_row_items() and matching_at_dest >= 1 and will_complete:
-        hidden_count = to_c.get_back_row_item_count()
+    if to_back_items and matching_at_dest >= 1 and will_complete:
+        hidden_count = len(to_back_items)
         triple_reveal_bonus = 50 + hidden_count * 20
         score += triple_reveal_bonus; reveal_contrib += triple_reveal_bonus
         reasons.append(f"triple reveals {hidden_count} hidden item(s)")
 
-        hidden_items = to_c.get_back_row_item_types()
-        unique_hidden = set(h for h in hidden_items if h != move.item_id)
+        hidden_items = to_back_items
+        unique_hidden = set(hidden_items) - {move.item_id}
         if unique_hidden:
             score += 30; reveal_contrib += 30
             reasons.append("clears container for revealed items")
 
-    # === STRATEGY WEIGHT ADJUSTMENTS ===
-    if strategy is not None:
-        score += int(pair_contrib * (strategy.pair_weight - 1.0))
-        score += int(reveal_contrib * (strategy.reveal_weight - 1.0))
-        score += int(penalty_contrib * (strategy.caution_weight - 1.0))
+    if record_reasons:
+        reason = ", ".join(reasons) if reasons else "neutral"
+    else:
+        reason = ""
 
-    reason = ", ".join(reasons) if reasons else "neutral"
-    return score, reason
+    probe_gain = None
+    if not probe_follow_up and not creates_match:
+        # A found follow-up adds at most: 120 (enables match), the follow-up
+        # reveal + chain bonuses, the skipped pairing block's penalty
+        # (replaced when it creates a pair), and the stuck / mixes penalties
+        mixes_penalty = 10 if matching_at_dest == 0 and len(dest_items) > 0 else 0
+        probe_gain = (120,
+                      max(0, -pairing_contrib) if matching_at_dest >= 1 else 0,
+                      20 + ctx.max_slot_count * 10 + 15,
+                      stuck_penalty + mixes_penalty)
+    return score, pair_contrib, reveal_contrib, penalty_contrib, reason, probe_gain
 
 
 # ── 1-Move Match Finding ─────────────────────────────────────────────────────
@@ -699,45 +998,49 @@ def _score_move_unified(state, move, item_status, strategy=None):
 def _find_one_move_match(state):
     """Find a move that immediately results in a triple match.
     When multiple exist, prefer ones that reveal hidden items."""
-    candidates = []
-
-    for ci, container in enumerate(state.containers):
-        if container.is_locked or container.slot_count < 3:
+    # Best candidate so far; strict > keeps the first of equal scores,
+    # as the stable descending sort this replaces did
+    best_move = None
+    best_reveal_score = 0
+    containers = state.containers
+
+    for ci, container in enumerate(containers):
+        slot_count = container.slot_count
+        if container.is_locked or slot_count < 3:
             continue
 
-        empty_slot = -1
-        for s in range(container.slot_count):
-            if container.is_front_slot_empty(s):
-                empty_slot = s
-                break
-        if empty_slot == -1:
+        # Front-row scans run as list builtins on the flat prefix
+        front_row = container.slots[:slot_count]
+        if None not in front_row:
             continue
+        empty_slot = front_row.index(None)
 
-        front = container.get_front_row_items()
-        if len(front) < 2:
+        if slot_count - front_row.count(None) < 2:
             continue
 
         # Count items in front row
         counts = {}
-        for item in front:
-            counts[item] = counts.get(item, 0) + 1
+        for item in front_row:
+            if item is not None:
+                counts[item] = counts.get(item, 0) + 1
 
         for target_item, cnt in counts.items():
             if cnt < 2:
                 continue
 
-            # Look for 3rd item elsewhere
-            for oci, other in enumerate(state.containers):
-                if oci == ci or other.is_locked:
+            # Look for 3rd item elsewhere (index keeps container order)
+            for oci, held in state.front_index[target_item].items():
+                if not held or oci == ci:
                     continue
-                for os in range(other.slot_count):
-                    if other.get_front_item(os) == target_item:
-                        move = Move(oci, os, ci, empty_slot, target_item)
-
+                other = containers[oci]
+                if other.is_locked:
+                    continue
+                other_front = other.slots[:other.slot_count]
+                for os, item in enumerate(other_front):
+                    if item is target_item:
                         # Score by reveal potential
                         reveal_score = 0
-                        from_occ = sum(1 for s2 in range(other.slot_count)
-                                       if not other.is_front_slot_empty(s2))
+                        from_occ = other.slot_count - other_front.count(None)
                         if from_occ == 1 and other.has_back_row_items():
                             revealed = _get_items_that_would_advance(other)
                             reveal_score += 100 + len(revealed) * 20
@@ -749,13 +1052,11 @@ def _find_one_move_match(state):
                             dest_rev = _get_items_that_would_advance(container)
                             reveal_score += 50 + len(dest_rev) * 15
 
-                        candidates.append((reveal_score, move))
+                        if best_move is None or reveal_score > best_reveal_score:
+                            best_move = Move(oci, os, ci, empty_slot, target_item)
+                            best_reveal_score = reveal_score
 
-    if not candidates:
-        return None
-
-    candidates.sort(key=lambda x: -x[0])
-    return candidates[0][1]
+    return best_move
 
 
 # ── Move Enumeration ─────────────────────────────────────────────────────────
@@ -770,140 +1071,215 @@ def _get_all_valid_moves(state):
        since slot position doesn't affect the solver's scoring or matching logic
        (match checks all 3 front items, not specific positions).
     """
-    # Identify completely empty unlocked containers and pick one representative per slot_count
-    empty_representatives = {}  # slot_count -> container index
-    empty_container_set = set()
-    for ci, c in enumerate(state.containers):
-        if not c.is_locked and c.is_empty():
-            empty_container_set.add(ci)
-            if c.slot_count not in empty_representatives:
-                empty_representatives[c.slot_count] = ci
+    # Destinations do not depend on the item being moved: resolve each
+    # usable container's target slot once, then pair it with every source item.
+    # The first completely empty container of each slot_count is its
+    # representative; only a fully empty front row can belong to one, so the
+    # emptiness check is folded into this pass instead of a separate scan.
+    destinations = []
+    empty_slot_counts = set()  # slot_counts that already have a representative
+    for to_ci, to_c in enumerate(state.containers):
+        if to_c.is_locked:
+            continue
+        # Only consider first empty slot in each destination container
+        front = to_c.slots[:to_c.slot_count]
+        if None in front:
+            if front.count(None) == to_c.slot_count and to_c.is_empty():
+                # Skip non-representative empty containers
+                if to_c.slot_count in empty_slot_counts:
+                    continue
+                empty_slot_counts.add(to_c.slot_count)
+            destinations.append((to_ci, front.index(None)))
 
     moves = []
     for from_ci, from_c in enumerate(state.containers):
         if from_c.is_locked:
             continue
-        for from_s in range(from_c.slot_count):
-            item = from_c.get_front_item(from_s)
+        for from_s, item in enumerate(from_c.slots[:from_c.slot_count]):
             if item is None:
                 continue
-            for to_ci, to_c in enumerate(state.containers):
-                if to_ci == from_ci or to_c.is_locked:
-                    continue
-                # Skip non-representative empty containers
-                if to_ci in empty_container_set and to_ci != empty_representatives.get(to_c.slot_count):
-                    continue
-                # Only consider first empty slot in each destination container
-                first_empty = -1
-                for to_s in range(to_c.slot_count):
-                    if to_c.is_front_slot_empty(to_s):
-                        first_empty = to_s
-                        break
-                if first_empty >= 0:
+            for to_ci, first_empty in destinations:
+                if to_ci != from_ci:
                     moves.append(Move(from_ci, from_s, to_ci, first_empty, item))
     return moves
 
 
 # ── Move Execution ───────────────────────────────────────────────────────────
 
-def _execute_move(state, move):
-    """Execute a move: remove from source, place at dest, advance rows."""
+def _execute_move(state, move, journal=None):
+    """Execute a move: remove from source, place at dest, advance rows.
+    If journal is given, every write is recorded so _undo can revert it."""
     from_c = state.containers[move.from_container]
     to_c = state.containers[move.to_container]
 
-    from_c.slots[move.from_slot][0] = None
-    to_c.slots[move.to_slot][0] = move.item_id
+    if journal is not None:
+        journal.append((from_c.slots, move.from_slot, from_c.slots[move.from_slot]))
+        journal.append((to_c.slots, move.to_slot, to_c.slots[move.to_slot]))
+        journal.append((state, "move_count", state.move_count))
+
+    from_c.slots[move.from_slot] = None
+    to_c.slots[move.to_slot] = move.item_id
     state.move_count += 1
 
-    _check_and_advance_rows(from_c)
+    counts = state.front_index[move.item_id]
+    if journal is not None:
+        journal.append((counts, move.from_container, counts[move.from_container]))
+        journal.append((counts, move.to_container, counts[move.to_container]))
+    counts[move.from_container] -= 1
+    counts[move.to_container] += 1
 
+    if _check_and_advance_rows(from_c, journal):
+        _index_front_row(state, move.from_container, journal)
 
-def _check_and_advance_rows(container):
-    """If all front slots are empty and back items exist, advance rows forward."""
-    # Check if all front slots empty
-    for s in range(container.slot_count):
-        if not container.is_front_slot_empty(s):
-            return
 
-    if not container.has_back_row_items():
-        return
+def _apply_move(state, move):
+    """Execute a move in place and return its journal (undo token for _undo)."""
+    journal = []
+    _execute_move(state, move, journal)
+    return journal
 
-    # Advance all rows forward
-    for s in range(container.slot_count):
-        first_non_null = -1
-        for r in range(1, len(container.slots[s])):
-            if container.slots[s][r] is not None:
-                first_non_null = r
-                break
 
-        if first_non_null > 0:
-            slot = container.slots[s]
-            num_rows = len(slot)
-            for r in range(first_non_null, num_rows):
-                slot[r - first_non_null] = slot[r]
-                if r >= first_non_null:
-                    slot[r] = None
+def _undo(journal):
+    """Revert journaled writes, newest first.
+    Entries are (slots, cell_index, prev_item), (slots, slice, prev_items),
+    (front_index counts, ci, prev_count) or (obj, attr_name, prev_value)."""
+    for target, key, prev in reversed(journal):
+        if type(key) is str:
+            setattr(target, key, prev)
+        else:
+            target[key] = prev
+
+
+def _index_front_row(state, ci, journal=None):
+    """Add container ci's (freshly advanced) front row to state.front_index."""
+    index = state.front_index
+    container = state.containers[ci]
+    for item in container.slots[:container.slot_count]:
+        if item is not None:
+            counts = index[item]
+            if journal is not None:
+                journal.append((counts, ci, counts[ci]))
+            counts[ci] += 1
+
+
+def _check_and_advance_rows(container, journal=None):
+    """If all front slots are empty and back items exist, advance rows forward.
+    Returns True if rows advanced."""
+    # Front row empty and something behind it. The front row is the prefix
+    # of the flat cell list, so both checks are C-level counts; with the
+    # front row empty, any occupied cell is a back-row item.
+    slots = container.slots
+    slot_count = container.slot_count
+    if slots[:slot_count].count(None) != slot_count or slots.count(None) == len(slots):
+        return False
+
+    # Advance all rows forward. Each slot's column is the strided slice
+    # slots[s::slot_count]; it is shifted up to its first occupied row with
+    # one slice assignment rather than cell by cell.
+    if journal is not None:
+        journal.append((slots, slice(None), slots[:]))
+    for s in range(slot_count):
+        column = slots[s::slot_count]
+        for first_non_null in range(1, len(column)):
+            if column[first_non_null] is not None:
+                slots[s::slot_count] = column[first_non_null:] + [None] * first_non_null
+                break
+    return True
 
 
 # ── Match Processing ─────────────────────────────────────────────────────────
 
-def _process_all_matches(state):
-    """Process all matches repeatedly until none remain. Returns match count."""
+def _process_all_matches(state, journal=None, dirty=None):
+    """Process all matches repeatedly until none remain. Returns match count.
+    If journal is given, every write is recorded so _undo can revert it.
+    A match only changes its own container's cells, so triples can only
+    appear in containers that were written to: dirty, if given, lists the
+    container indices to check, and must cover every possible triple."""
     total = 0
-    while True:
-        found = False
-        for ci, container in enumerate(state.containers):
-            if container.slot_count < 3:
-                continue
-            if _process_container_match(state, container):
-                found = True
-                total += 1
-        if not found:
-            break
+    containers = state.containers
+    for ci in state.matchable if dirty is None else dirty:
+        container = containers[ci]
+        slot_count = container.slot_count
+        if slot_count < 3:  # dirty may name unmatchable containers
+            continue
+        # A match advances this container's rows, which can expose another
+        # triple here. Inline triple test via front_index: most containers
+        # don't match, so only real matches pay for the call.
+        while True:
+            item = container.slots[0]
+            if item is None or state.front_index[item][ci] != slot_count:
+                break
+            if not _process_container_match(state, ci, container, journal):
+                break
+            total += 1
     return total
 
 
-def _process_container_match(state, container):
+def _process_container_match(state, ci, container, journal=None):
     """Check if container front row is a complete triple match. Process if so."""
-    front = [container.get_front_item(s) for s in range(container.slot_count)]
-
-    if any(f is None for f in front):
-        return False
-    if len(set(front)) != 1:
+    slots = container.slots
+    item = slots[0]
+    if item is None:
         return False
+    for s in range(1, container.slot_count):
+        if slots[s] is not item:
+            return False
 
     # Match! Clear front row
     for s in range(container.slot_count):
-        container.slots[s][0] = None
-
+        if journal is not None:
+            journal.append((slots, s, item))
+        slots[s] = None
+
+    counts = state.front_index[item]
+    if journal is not None:
+        journal.append((counts, ci, counts[ci]))
+        journal.append((state, "match_count", state.match_count))
+    counts[ci] -= container.slot_count
     state.match_count += 1
 
     # Unlock progress
     for c in state.containers:
         if c.is_locked:
+            if journal is not None:
+                journal.append((c, "current_unlock_progress", c.current_unlock_progress))
+                journal.append((c, "is_locked", True))
             c.current_unlock_progress += 1
             if c.current_unlock_progress >= c.unlock_matches_required:
                 c.is_locked = False
 
-    _check_and_advance_rows(container)
+    if _check_and_advance_rows(container, journal):
+        _index_front_row(state, ci, journal)
     return True
 
 
 def _would_match(state):
     """Check if any container has a complete triple match."""
-    for c in state.containers:
-        if c.slot_count < 3:
-            continue
-        front = [c.get_front_item(s) for s in range(c.slot_count)]
-        if all(f is not None for f in front) and len(set(front)) == 1:
+    for ci in state.matchable:
+        if _front_is_triple(state, ci):
             return True
     return False
 
 
+def _front_is_triple(state, ci):
+    """Whether container ci's front row is one item repeated slot_count (>= 3)
+    times. front_index already counts each item per front row, so this is a
+    lookup on the first slot's item rather than a scan of the row."""
+    container = state.containers[ci]
+    item = container.slots[0]
+    return (item is not None and container.slot_count >= 3
+            and state.front_index[item][ci] == container.slot_count)
+
+
 # ── Utility ──────────────────────────────────────────────────────────────────
 
+def _pattern_key(move):
+    """Key under which a move is remembered for the pattern penalty."""
+    return (move.item_id, move.from_container, move.to_container)
+
+
 def _is_reversal_move(current, previous):
-    return (current.item_id == previous.item_id and
+    return (current.item_id is previous.item_id and
             current.from_container == previous.to_container and
             current.to_container == previous.from_container)
 
@@ -911,28 +1287,26 @@ def _is_reversal_move(current, previous):
 def _get_items_that_would_advance(container):
     """Get items that would advance to front row if front were cleared."""
     items = []
-    for s in range(container.slot_count):
-        for r in range(1, len(container.slots[s])):
-            if container.slots[s][r] is not None:
-                items.append(container.slots[s][r])
+    slots = container.slots
+    slot_count = container.slot_count
+    for s in range(slot_count):
+        for r in range(1, container.max_rows):
+            if slots[r * slot_count + s] is not None:
+                items.append(slots[r * slot_count + s])
                 break
     return items
 
 
 def _has_waiting_pair_for_item(state, item_id):
     """Check if any container has 2 of this item + empty slot (waiting for 3rd)."""
-    for c in state.containers:
+    containers = state.containers
+    for ci, held in state.front_index[item_id].items():
+        if held != 2:
+            continue
+        c = containers[ci]
         if c.is_locked or c.slot_count < 3:
             continue
-        match_count = 0
-        empty_count = 0
-        for s in range(c.slot_count):
-            front = c.get_front_item(s)
-            if front == item_id:
-                match_count += 1
-            elif front is None:
-                empty_count += 1
-        if match_count == 2 and empty_count >= 1:
+        if None in c.slots[:c.slot_count]:
             return True
     return False
 
@@ -19,6 +19,14 @@ This is safe to re-run; it's idempotent.
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# orjson is an optional speedup; without it the stdlib json module is used.
+# Both write the same compact output for the (ASCII) level files.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Default values for container fields — if a field matches its default, omit it.
 CONTAINER_DEFAULTS = {
@@ -92,27 +100,41 @@ def minify_level(level_data):
     return result
 
 
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps_compact(data):
+        return orjson.dumps(data).decode("utf-8")
+else:
+    loads = json.loads
+
+    def dumps_compact(data):
+        return json.dumps(data, separators=(",", ":"))
+
+
 def process_file(filepath):
-    """Minify a single level JSON file. Returns (original_size, new_size)."""
-    with open(filepath, "r") as f:
+    """Minify a single level JSON file. Returns (original_size, new_size).
+    Files that are already minified are left untouched."""
+    with open(filepath, "rb") as f:
         original = f.read()
 
-    original_size = len(original.encode("utf-8"))
+    original_size = len(original)
 
     try:
-        data = json.loads(original)
-    except json.JSONDecodeError as e:
+        data = loads(original)
+    except json.JSONDecodeError as e:  # orjson's decode error subclasses it
         print(f"  ERROR: Failed to parse {filepath}: {e}")
         return original_size, original_size
 
     minified = minify_level(data)
-    compact = json.dumps(minified, separators=(",", ":"))
+    compact = dumps_compact(minified).encode("utf-8")
 
-    with open(filepath, "w", newline="\n") as f:
-        f.write(compact)
+    # Re-runs are the common case: skip the write when nothing changed
+    if compact != original:
+        with open(filepath, "wb") as f:
+            f.write(compact)
 
-    new_size = len(compact.encode("utf-8"))
-    return original_size, new_size
+    return original_size, len(compact)
 
 
 def main():
@@ -130,8 +152,10 @@ def main():
     total_new = 0
     file_count = 0
 
-    worlds = sorted(os.listdir(base_dir))
-    for world in worlds:
+    # Collect every level first so the files can be minified in parallel;
+    # each one is an independent read-transform-write
+    world_files = []
+    for world in sorted(os.listdir(base_dir)):
         world_dir = os.path.join(base_dir, world)
         if not os.path.isdir(world_dir):
             continue
@@ -139,28 +163,34 @@ def main():
         files = sorted(f for f in os.listdir(world_dir)
                        if f.startswith("level_") and f.endswith(".json"))
 
-        if not files:
-            continue
-
-        world_original = 0
-        world_new = 0
-
-        print(f"\n{world}: {len(files)} levels")
-
-        for filename in files:
-            filepath = os.path.join(world_dir, filename)
-            orig, new = process_file(filepath)
-            world_original += orig
-            world_new += new
-            file_count += 1
-
-        savings = world_original - world_new
-        pct = (savings / world_original * 100) if world_original > 0 else 0
-        print(f"  {world_original:,} -> {world_new:,} bytes "
-              f"(saved {savings:,} bytes, {pct:.1f}%)")
-
-        total_original += world_original
-        total_new += world_new
+        if files:
+            world_files.append((world, [os.path.join(world_dir, f) for f in files]))
+
+    with ProcessPoolExecutor() as pool:
+        # map() yields results in submission order, so they can be consumed
+        # world by world below
+        results = pool.map(process_file,
+                           [path for _, paths in world_files for path in paths],
+                           chunksize=8)
+        for world, paths in world_files:
+            world_original = 0
+            world_new = 0
+
+            print(f"\n{world}: {len(paths)} levels")
+
+            for _ in paths:
+                orig, new = next(results)
+                world_original += orig
+                world_new += new
+                file_count += 1
+
+            savings = world_original - world_new
+            pct = (savings / world_original * 100) if world_original > 0 else 0
+            print(f"  {world_original:,} -> {world_new:,} bytes "
+                  f"(saved {savings:,} bytes, {pct:.1f}%)")
+
+            total_original += world_original
+            total_new += world_new
 
     if file_count == 0:
         print("No level files found!")
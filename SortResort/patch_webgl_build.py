@@ -12,7 +12,6 @@ Run after every WebGL build:
 """
 
 import gzip
-import io
 import os
 import sys
 
@@ -42,8 +41,9 @@ def patch_framework():
 
     # Read file
     if is_compressed:
-        with open(framework_path, "rb") as f:
-            data = gzip.decompress(f.read()).decode("utf-8")
+        # newline="" keeps \r\n and \r as-is; only the import key may change
+        with gzip.open(framework_path, "rt", encoding="utf-8", newline="") as f:
+            data = f.read()
     else:
         with open(framework_path, "r") as f:
             data = f.read()
@@ -62,18 +62,26 @@ def patch_framework():
     data = data.replace(MINIFIED, PATCHED)
     print(f"Patched: {MINIFIED} -> {PATCHED}")
 
-    # Write back
-    if is_compressed:
-        filename = os.path.basename(framework_path).replace(".unityweb", "")
-        buf = io.BytesIO()
-        with gzip.GzipFile(filename=filename, mode="wb",
-                           fileobj=buf, mtime=0) as gz:
-            gz.write(data.encode("utf-8"))
-        with open(framework_path, "wb") as f:
-            f.write(buf.getvalue())
-    else:
-        with open(framework_path, "w", newline="\n") as f:
-            f.write(data)
+    # Write back: stream into a temp file next to the original, then swap it
+    # in so an interrupted run never leaves a truncated framework behind
+    tmp_path = framework_path + ".tmp"
+    try:
+        if is_compressed:
+            filename = os.path.basename(framework_path).replace(".unityweb", "")
+            with open(tmp_path, "wb") as raw, \
+                    gzip.GzipFile(filename=filename, mode="wb",
+                                  fileobj=raw, mtime=0) as gz:
+                gz.write(data.encode("utf-8"))
+        else:
+            with open(tmp_path, "w", newline="\n") as f:
+                f.write(data)
+        os.replace(tmp_path, framework_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
     final_size = os.path.getsize(framework_path)
     print(f"Written: {framework_path} ({final_size:,} bytes)")
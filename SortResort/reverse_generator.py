@@ -18,16 +18,29 @@ Algorithm (V2 - push-based, no work container):
   Star thresholds are derived from construction move count.
 """
 
+import atexit
+import bisect
 import gc
+import hashlib
 import json
 import math
 import os
 import random
+import struct
 import subprocess
-import tempfile
 import sys
+import threading
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 
+# orjson is an optional speedup for writing levels; without it the stdlib
+# json module produces the same compact output.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from level_generator import (
     WorldConfig, get_level_spec, build_containers,
     get_available_items, select_items, calc_timer,
@@ -42,6 +55,10 @@ from level_solver import solve_level, solve_level_best
 
 # ── Reverse-Play Item Placement ─────────────────────────────────────────────
 
+# Cumulative scatter-count probabilities: a roll below _SCATTER_CDF[k]
+# scatters k + 1 items, anything above the last entry scatters 3
+_SCATTER_CDF = (0.10, 0.60)
+
 def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
     """Place items using reverse-play construction.
 
@@ -64,13 +81,19 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
     if not unlocked and not locked:
         return 0, 0
 
-    # Per-container row limits and grid
+    # Per-container row limits and grid. Each container's cells live in one
+    # flat row-major list (same layout as level_solver.ContainerState):
+    # grid[cid][r * slot_count + s], so the front row is the prefix
+    # grid[cid][:slot_count] and row scans are slice operations.
     c_rows = {}
     grid = {}
     for c in containers:
         mr = c.get("max_rows_per_slot", max_rows)
         c_rows[c["id"]] = mr
-        grid[c["id"]] = [[None] * mr for _ in range(c["slot_count"])]
+        grid[c["id"]] = [None] * (c["slot_count"] * mr)
+    # Empty front slots per container, kept in step with every front-row
+    # write so front-row scans reduce to a lookup
+    front_free = {c["id"]: c["slot_count"] for c in containers}
 
     all_triples = list(item_ids)
     # NOTE: Do NOT shuffle here — caller controls placement order
@@ -108,74 +131,86 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
             return True
         return triples_placed < lock_cutoffs.get(c["id"], 0)
 
+    # A locked container drops out once triples_placed reaches its cutoff, so
+    # the active list only changes at those points: build it once per band
+    # between consecutive cutoffs.
+    cutoff_points = sorted(lock_cutoffs.values())
+    active_by_band = {}
+
     def get_active_containers(triples_placed):
-        """Get all containers that can participate right now."""
-        return [c for c in containers if is_active(c, triples_placed)]
+        """Get all containers that can participate right now (shared list;
+        callers must not modify it)."""
+        band = bisect.bisect_right(cutoff_points, triples_placed)
+        active = active_by_band.get(band)
+        if active is None:
+            active = [c for c in containers if is_active(c, triples_placed)]
+            active_by_band[band] = active
+        return active
 
     def front_empty(cid, slots):
         """Check if all front-row slots are empty."""
-        return all(grid[cid][s][0] is None for s in range(slots))
+        return front_free[cid] == slots
 
     def can_push(cid, slots, mr):
         """Check if items can be pushed one row deeper."""
         if mr <= 1:
             return False
-        return all(grid[cid][s][mr - 1] is None for s in range(slots))
+        return grid[cid][(mr - 1) * slots:].count(None) == slots
 
     def push_deeper(cid, slots, mr):
         """Shift all items one row deeper in this container."""
-        for s in range(slots):
-            for r in range(mr - 1, 0, -1):
-                grid[cid][s][r] = grid[cid][s][r - 1]
-            grid[cid][s][0] = None
+        cells = grid[cid]
+        cells[slots:] = cells[:(mr - 1) * slots]
+        cells[:slots] = [None] * slots
+        front_free[cid] = slots
+
+    # Scatter candidates per band: (cid, front slot indices) of the active
+    # on-screen containers, so each query is a single flat pass
+    scatter_by_band = {}
 
     def get_scatter_dests(exclude_cid, triples_placed):
         """Get empty front slots in other active on-screen containers.
         Excludes off-screen containers (players can't reach them)."""
-        dests = []
-        for c in get_active_containers(triples_placed):
-            if c["id"] == exclude_cid:
-                continue
-            if c["id"] in off_screen_ids:
-                continue  # Don't scatter to off-screen containers
-            for s in range(c["slot_count"]):
-                if grid[c["id"]][s][0] is None:
-                    dests.append((c["id"], s))
-        return dests
+        band = bisect.bisect_right(cutoff_points, triples_placed)
+        candidates = scatter_by_band.get(band)
+        if candidates is None:
+            candidates = [(c["id"], range(c["slot_count"]))
+                          for c in get_active_containers(triples_placed)
+                          if c["id"] not in off_screen_ids]
+            scatter_by_band[band] = candidates
+        return [(cid, s) for cid, front in candidates
+                if cid != exclude_cid and front_free[cid]
+                for s in front if grid[cid][s] is None]
 
     # ── Place each triple ──────────────────────────────────────────────
     total_triples = 0
     total_moves = 0
 
     # Track empty front slots across active unlocked containers
-    empty_front_count = sum(
-        1 for c in unlocked
-        for s in range(c["slot_count"])
-        if grid[c["id"]][s][0] is None
-    )
+    empty_front_count = sum(front_free[c["id"]] for c in unlocked)
     MIN_EMPTY_FRONT = 3  # Always keep at least 3 empty front slots
 
     for item_id in all_triples:
         active = get_active_containers(total_triples)
 
-        # Find eligible containers: 3-slot, active, front empty or can push
+        # Find eligible containers: 3-slot, active, front empty or can push.
+        # Those that need pushing are collected in the same pass.
         eligible = []
+        need_push = []
         for c in active:
             if c["slot_count"] < 3:
                 continue
             cid = c["id"]
-            mr = c_rows[cid]
             if front_empty(cid, c["slot_count"]):
                 eligible.append(c)
-            elif can_push(cid, c["slot_count"], mr):
+            elif can_push(cid, c["slot_count"], c_rows[cid]):
                 eligible.append(c)
+                need_push.append(c)
 
         if not eligible:
             break  # No room to host any more triples
 
         # Prefer containers that need pushing (preserves empty front slots).
-        need_push = [c for c in eligible
-                     if not front_empty(c["id"], c["slot_count"])]
         if need_push and (empty_front_count <= MIN_EMPTY_FRONT + 3
                           or rng.random() < 0.7):
             target = rng.choice(need_push)
@@ -186,10 +221,7 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
         mr = c_rows[cid]
 
         # Push existing items deeper if front isn't empty
-        host_front_items = sum(
-            1 for s in range(target["slot_count"])
-            if grid[cid][s][0] is not None
-        )
+        host_front_items = target["slot_count"] - front_free[cid]
         if host_front_items > 0:
             push_deeper(cid, target["slot_count"], mr)
             if not target["is_locked"]:
@@ -197,7 +229,8 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
 
         # Place triple at front row
         for s in range(min(3, target["slot_count"])):
-            grid[cid][s][0] = item_id
+            grid[cid][s] = item_id
+        front_free[cid] -= min(3, target["slot_count"])
         if not target["is_locked"]:
             empty_front_count -= 3
 
@@ -210,15 +243,11 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
             continue
 
         # Scatter 1-3 items with weighted distribution to reduce leftover pairs:
-        # 10% scatter 1 (leaves pair), 50% scatter 2, 40% scatter 3
+        # 10% scatter 1 (leaves pair), 50% scatter 2, 40% scatter 3; capped
+        # by the available destinations
         max_scatter = min(3, len(dests))
         roll = rng.random()
-        if max_scatter == 1:
-            n_scatter = 1
-        elif max_scatter == 2:
-            n_scatter = 1 if roll < 0.10 else 2
-        else:
-            n_scatter = 1 if roll < 0.10 else (2 if roll < 0.60 else 3)
+        n_scatter = min(max_scatter, bisect.bisect_right(_SCATTER_CDF, roll) + 1)
 
         rng.shuffle(dests)
 
@@ -229,8 +258,10 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
 
         for i, slot in enumerate(scatter_slots):
             dest_cid, dest_slot = dests[i]
-            grid[dest_cid][dest_slot][0] = item_id
-            grid[cid][slot][0] = None
+            grid[dest_cid][dest_slot] = item_id
+            grid[cid][slot] = None
+            front_free[dest_cid] -= 1
+        front_free[cid] += n_scatter
 
         total_triples += 1
         total_moves += n_scatter
@@ -243,32 +274,33 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
                 if c["id"] in off_screen_ids:
                     continue  # Don't move from off-screen
                 for s in range(c["slot_count"]):
-                    if grid[c["id"]][s][0] is not None:
+                    if grid[c["id"]][s] is not None:
                         sources.append((c["id"], s))
             if sources:
                 rng.shuffle(sources)
+                # Empty on-screen front slots don't depend on the source:
+                # gather them once, then drop the source's own container
+                empty_dests = [
+                    (c["id"], s) for c in active_now
+                    if c["id"] not in off_screen_ids
+                    for s in range(c["slot_count"])
+                    if grid[c["id"]][s] is None
+                ]
                 for src_cid, src_s in sources:
-                    var_dests = [
-                        (c["id"], s) for c in active_now
-                        if c["id"] != src_cid and c["id"] not in off_screen_ids
-                        for s in range(c["slot_count"])
-                        if grid[c["id"]][s][0] is None
-                    ]
+                    var_dests = [d for d in empty_dests if d[0] != src_cid]
                     if var_dests:
                         dst_cid, dst_s = rng.choice(var_dests)
-                        grid[dst_cid][dst_s][0] = grid[src_cid][src_s][0]
-                        grid[src_cid][src_s][0] = None
+                        grid[dst_cid][dst_s] = grid[src_cid][src_s]
+                        grid[src_cid][src_s] = None
+                        front_free[dst_cid] -= 1
+                        front_free[src_cid] += 1
                         total_moves += 1
                         break
 
     # ── Ensure playable board (enough empty front slots) ───────────────
     # Only count unlocked containers for empty front slots (locked ones
     # aren't accessible at game start)
-    empty_front_count = sum(
-        1 for c in unlocked
-        for s in range(c["slot_count"])
-        if grid[c["id"]][s][0] is None
-    )
+    empty_front_count = sum(front_free[c["id"]] for c in unlocked)
     if empty_front_count < MIN_EMPTY_FRONT:
         for c in unlocked:
             if empty_front_count >= MIN_EMPTY_FRONT:
@@ -277,15 +309,18 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
             mr = c_rows[cid]
             if mr <= 1:
                 continue
-            for s in range(c["slot_count"]):
+            slots = c["slot_count"]
+            cells = grid[cid]
+            for s in range(slots):
                 if empty_front_count >= MIN_EMPTY_FRONT:
                     break
-                if grid[cid][s][0] is None:
+                if cells[s] is None:
                     continue  # Already empty
                 for r in range(1, mr):
-                    if grid[cid][s][r] is None:
-                        grid[cid][s][r] = grid[cid][s][0]
-                        grid[cid][s][0] = None
+                    if cells[r * slots + s] is None:
+                        cells[r * slots + s] = cells[s]
+                        cells[s] = None
+                        front_free[cid] += 1
                         empty_front_count += 1
                         break
 
@@ -301,11 +336,13 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
     for c in containers:
         c["initial_items"] = []
         mr = c_rows[c["id"]]
-        for s in range(c["slot_count"]):
+        slots = c["slot_count"]
+        cells = grid[c["id"]]
+        for s in range(slots):
             for r in range(mr):
-                if grid[c["id"]][s][r] is not None:
+                if cells[r * slots + s] is not None:
                     c["initial_items"].append({
-                        "id": grid[c["id"]][s][r],
+                        "id": cells[r * slots + s],
                         "row": r,
                         "slot": s,
                     })
@@ -315,7 +352,7 @@ def reverse_place_items(containers, item_ids, max_rows, rng, level=1):
 
 def _would_create_triple(grid, cid, slot_count, row, incoming_item):
     """Check if placing incoming_item at any slot in this row would complete a triple."""
-    row_items = [grid[cid][s][row] for s in range(slot_count)]
+    row_items = grid[cid][row * slot_count:(row + 1) * slot_count]
     # Count how many slots already have incoming_item (excluding the one being swapped)
     match_count = sum(1 for item in row_items if item == incoming_item)
     # If 2+ other slots have this item, placing it would create a triple
@@ -325,29 +362,34 @@ def _would_create_triple(grid, cid, slot_count, row, incoming_item):
 def _fix_starting_triples(grid, pool, rng, c_rows):
     """If any 3-slot container has 3 matching items in ANY row, swap one out.
     Checks all rows (not just front) to prevent hidden triples that auto-match
-    when row advancement occurs. Loops until none remain (max 100 iterations).
+    when row advancement occurs. Loops until none remain (max 100 fixes).
 
     Safety: verifies the swap won't create a new triple in the destination,
-    and varies which slot is swapped from to avoid cycling."""
-    for _ in range(100):
-        found = False
-        for c in pool:
-            cid = c["id"]
-            if c["slot_count"] < 3:
-                continue
-            mr = c_rows[cid]
-            for r in range(mr):
-                row_items = [grid[cid][s][r] for s in range(c["slot_count"])]
-                if any(item is None for item in row_items):
-                    continue
-                if len(set(row_items)) != 1:
-                    continue
+    and varies which slot is swapped from to avoid cycling. Because a swap
+    never creates a triple anywhere else, the scan resumes at the row it just
+    fixed rather than restarting from the first container."""
+    fixes_left = 100
+    for c in pool:
+        cid = c["id"]
+        slots = c["slot_count"]
+        if slots < 3:
+            continue
+        cells = grid[cid]
+        for r in range(c_rows[cid]):
+            # A failed swap leaves the triple in place; retry it (with fresh
+            # shuffles) until it is fixed or the fix budget runs out
+            while True:
+                target_item = cells[r * slots]
+                if (target_item is None
+                        or cells[r * slots:(r + 1) * slots].count(target_item) != slots):
+                    break
+                if not fixes_left:
+                    return
+                fixes_left -= 1
 
                 # Triple found at row r — swap a random slot with another container
-                found = True
-                target_item = row_items[0]
                 # Vary which slot we swap from (not always slot 0)
-                swap_from_slots = list(range(c["slot_count"]))
+                swap_from_slots = list(range(slots))
                 rng.shuffle(swap_from_slots)
                 swapped = False
                 candidates = list(pool)
@@ -359,11 +401,12 @@ def _fix_starting_triples(grid, pool, rng, c_rows):
                         if other["id"] == cid:
                             continue
                         o_mr = c_rows[other["id"]]
+                        o_slots = other["slot_count"]
                         swap_row = r if r < o_mr else 0
-                        slot_indices = list(range(other["slot_count"]))
+                        slot_indices = list(range(o_slots))
                         rng.shuffle(slot_indices)
                         for os_idx in slot_indices:
-                            oi = grid[other["id"]][os_idx][swap_row]
+                            oi = grid[other["id"]][swap_row * o_slots + os_idx]
                             if oi is None or oi == target_item:
                                 continue
                             # Safety: verify swap won't create triple in destination
@@ -371,43 +414,34 @@ def _fix_starting_triples(grid, pool, rng, c_rows):
                                                     other["slot_count"],
                                                     swap_row, target_item):
                                 continue
-                            grid[cid][swap_from][r] = oi
-                            grid[other["id"]][os_idx][swap_row] = target_item
+                            cells[r * slots + swap_from] = oi
+                            grid[other["id"]][swap_row * o_slots + os_idx] = target_item
                             swapped = True
                             break
                         if swapped:
                             break
-                if found:
-                    break  # restart scan after a fix
-            if found:
-                break
-        if not found:
-            break
 
 
 def _ensure_no_empty_containers(grid, pool, rng, c_rows):
     """Move an item to any unlocked container that ended up empty."""
+    # Item count per container, counted once and kept current on each steal
+    fill = {c["id"]: len(grid[c["id"]]) - grid[c["id"]].count(None) for c in pool}
     for c in pool:
         cid = c["id"]
-        mr = c_rows[cid]
-        has_any = any(grid[cid][s][r] is not None
-                      for s in range(c["slot_count"]) for r in range(mr))
-        if has_any:
+        if fill[cid]:
             continue
 
         # Steal one front item from the fullest container
-        fullest = max(pool, key=lambda x: sum(
-            1 for s in range(x["slot_count"])
-            for r in range(c_rows[x["id"]])
-            if grid[x["id"]][s][r] is not None
-        ))
+        fullest = max(pool, key=lambda x: fill[x["id"]])
         if fullest["id"] == cid:
             continue
         for s in range(fullest["slot_count"]):
-            if grid[fullest["id"]][s][0] is not None:
-                item = grid[fullest["id"]][s][0]
-                grid[fullest["id"]][s][0] = None
-                grid[cid][0][0] = item
+            if grid[fullest["id"]][s] is not None:
+                item = grid[fullest["id"]][s]
+                grid[fullest["id"]][s] = None
+                grid[cid][0] = item
+                fill[fullest["id"]] -= 1
+                fill[cid] += 1
                 break
 
 
@@ -419,6 +453,8 @@ def _ensure_singleslot_depth(grid, containers, rng, c_rows):
     Steals items from the fullest other unlocked container if needed.
     """
     unlocked = [c for c in containers if not c["is_locked"]]
+    # Item count per container, counted once and kept current on each steal
+    fill = {c["id"]: len(grid[c["id"]]) - grid[c["id"]].count(None) for c in containers}
 
     for c in containers:
         if c["slot_count"] != 1:
@@ -428,9 +464,10 @@ def _ensure_singleslot_depth(grid, containers, rng, c_rows):
         if mr < 2:
             continue
 
-        # Count items in this container
-        items_here = sum(1 for r in range(mr) if grid[cid][0][r] is not None)
-        back_items = sum(1 for r in range(1, mr) if grid[cid][0][r] is not None)
+        # Count items in this container (one slot, so cell index == row)
+        cells = grid[cid]
+        items_here = fill[cid]
+        back_items = items_here - (cells[0] is not None)
 
         if items_here >= 2 and back_items >= 1:
             continue  # Already has depth
@@ -438,36 +475,34 @@ def _ensure_singleslot_depth(grid, containers, rng, c_rows):
         # Need at least 2 items total with at least 1 in back row
         if items_here < 2:
             # Steal items from fullest unlocked container
-            donors = sorted(unlocked, key=lambda x: sum(
-                1 for s in range(x["slot_count"])
-                for r in range(c_rows[x["id"]])
-                if grid[x["id"]][s][r] is not None
-            ), reverse=True)
+            donors = sorted(unlocked, key=lambda x: fill[x["id"]], reverse=True)
 
             for donor in donors:
                 if donor["id"] == cid:
                     continue
                 did = donor["id"]
                 for s in range(donor["slot_count"]):
-                    if grid[did][s][0] is not None and items_here < 2:
-                        item = grid[did][s][0]
-                        grid[did][s][0] = None
+                    if grid[did][s] is not None and items_here < 2:
+                        item = grid[did][s]
+                        grid[did][s] = None
                         # Place in first empty row
                         for r in range(mr):
-                            if grid[cid][0][r] is None:
-                                grid[cid][0][r] = item
+                            if cells[r] is None:
+                                cells[r] = item
                                 items_here += 1
                                 break
+                        fill[did] -= 1
+                        fill[cid] += 1
                 if items_here >= 2:
                     break
 
         # Ensure at least 1 item is in a back row
-        back_items = sum(1 for r in range(1, mr) if grid[cid][0][r] is not None)
+        back_items = mr - 1 - cells[1:].count(None)
         if back_items == 0 and items_here >= 2:
             # Move front item to row 1
-            if grid[cid][0][0] is not None and grid[cid][0][1] is None:
-                grid[cid][0][1] = grid[cid][0][0]
-                grid[cid][0][0] = None
+            if cells[0] is not None and cells[1] is None:
+                cells[1] = cells[0]
+                cells[0] = None
 
 
 def _fix_auto_advance_empties(grid, containers, rng, c_rows):
@@ -484,30 +519,27 @@ def _fix_auto_advance_empties(grid, containers, rng, c_rows):
         if mr <= 1:
             continue
 
+        slots = c["slot_count"]
+        cells = grid[cid]
+
         # Check: are ALL front slots empty?
-        all_front_empty = all(
-            grid[cid][s][0] is None for s in range(c["slot_count"])
-        )
+        all_front_empty = cells[:slots].count(None) == slots
         if not all_front_empty:
             continue
 
         # Check: are there any back items that would auto-advance?
-        has_back = any(
-            grid[cid][s][r] is not None
-            for s in range(c["slot_count"])
-            for r in range(1, mr)
-        )
+        has_back = cells.count(None) != len(cells)
         if not has_back:
             continue
 
         # Pull the first back-row item we find to the front of its slot.
         # Only need one occupied front slot to prevent auto-advance.
         fixed = False
-        for s in range(c["slot_count"]):
+        for s in range(slots):
             for r in range(1, mr):
-                if grid[cid][s][r] is not None:
-                    grid[cid][s][0] = grid[cid][s][r]
-                    grid[cid][s][r] = None
+                if cells[r * slots + s] is not None:
+                    cells[s] = cells[r * slots + s]
+                    cells[r * slots + s] = None
                     fixed = True
                     break
             if fixed:
@@ -525,6 +557,16 @@ def get_max_triples(containers, max_rows):
 
 # ── Level Generation ─────────────────────────────────────────────────────────
 
+# Optimal move count of the hardcoded tutorial level
+TUTORIAL_MOVES = 2
+
+
+def _is_tutorial_level(level, config):
+    """Level 1 of the default world (no complexity offset) is a hardcoded
+    tutorial with a known TUTORIAL_MOVES solution."""
+    return level == 1 and config.complexity_offset == 0
+
+
 def generate_level(level, config, item_usage, seed_offset=0):
     """Generate a single level using reverse-play construction."""
     spec = get_level_spec(level, config.complexity_offset)
@@ -535,7 +577,7 @@ def generate_level(level, config, item_usage, seed_offset=0):
     containers = build_containers(spec, config)
 
     # Level 1: hardcoded 2-move tutorial (only for default world with no offset)
-    if level == 1 and config.complexity_offset == 0:
+    if _is_tutorial_level(level, config):
         available = get_available_items(config, level)
         selected = select_items(rng, available, 2, item_usage)
         a, b = selected[0], selected[1]
@@ -560,7 +602,8 @@ def generate_level(level, config, item_usage, seed_offset=0):
 
     # Determine item count
     total_capacity = sum(c["slot_count"] * c["max_rows_per_slot"] for c in containers)
-    max_placeable = get_max_triples(containers, spec["max_rows"])
+    # == get_max_triples(containers, ...): build_containers sets max_rows_per_slot
+    max_placeable = total_capacity // 3
 
     target_fill = get_target_fill_ratio(effective)
     target_triples = max(2, math.ceil(total_capacity * target_fill / 3))
@@ -669,14 +712,327 @@ def _compact_level(level_data):
     return result
 
 
+def _overlapping_pairs(boxes, gap):
+    """Index pairs (i, j), i < j, of boxes that _boxes_overlap with gap, in
+    the same order as a nested i/j loop.
+
+    Sweeps boxes by x_min: once a box's x_max + gap no longer passes the
+    current x_min, it cannot overlap any later box and leaves the active set,
+    so only boxes whose x ranges meet are tested."""
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+    active = []
+    pairs = []
+    for j in order:
+        x_min = boxes[j][0]
+        active = [i for i in active if boxes[i][1] + gap > x_min]
+        for i in active:
+            if _boxes_overlap(boxes[i], boxes[j], gap=gap):
+                pairs.append((i, j) if i < j else (j, i))
+        active.append(j)
+    pairs.sort()
+    return pairs
+
+
+def _compact_json_bytes(data):
+    """Serialize data as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _write_bytes(path, payload):
+    """Write payload bytes to path."""
+    with open(path, "wb") as f:
+        f.write(payload)
+
+
 # ── Batch Generation ─────────────────────────────────────────────────────────
 
-def generate_levels(config, output_dir, count=100, start_level=None, end_level=None):
+# Solver results keyed by a digest of the level JSON, shared across
+# generate_levels calls in one process (LRU, capped at SOLVE_CACHE_LIMIT)
+SOLVE_CACHE_LIMIT = 4096
+_solve_cache = OrderedDict()
+_solve_cache_lock = threading.Lock()
+
+# Background threads writing level files in generate_levels
+LEVEL_WRITE_WORKERS = 4
+
+# Row of the construction-vs-solver table: level, construct, solver, diff, %
+_COMPARISON_ROW = "  L{:>3}  {:>9}  {:>6}  {:>+5}  {:>+5.1f}%".format
+
+
+# Persistent solver_subprocess.py --serve workers, reused across solves so
+# interpreter startup and the level_solver import are paid once per worker
+# rather than once per level. A worker is retired after
+# SOLVER_WORKER_MAX_SOLVES levels so no single interpreter lives too long.
+SOLVER_WORKER_MAX_SOLVES = 50
+SOLVER_TIMEOUT_S = 120
+# Workers run with --stats-only: results are solver_subprocess.STATS_FORMAT
+_SOLVER_STATS = struct.Struct('<BII')
+# pass_fds is POSIX-only; on Windows levels go over the worker's stdin
+_SOLVER_PIPE_INHERIT = os.name != 'nt'
+_idle_solver_workers = []
+_idle_solver_workers_lock = threading.Lock()
+
+
+class _SolverWorker:
+    """A solver_subprocess.py --serve child, used by one thread at a time.
+    Levels reach it over a dedicated pipe it inherits (its stdin on Windows)."""
+
+    def __init__(self, script_dir):
+        if _SOLVER_PIPE_INHERIT:
+            read_fd, write_fd = os.pipe()
+            try:
+                self.proc = subprocess.Popen(
+                    [sys.executable, 'solver_subprocess.py', '--serve', str(read_fd),
+                     '--stats-only'],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE, cwd=script_dir, pass_fds=(read_fd,)
+                )
+            except BaseException:
+                os.close(write_fd)
+                raise
+            finally:
+                os.close(read_fd)
+            self.requests = os.fdopen(write_fd, 'wb')
+        else:
+            self.proc = subprocess.Popen(
+                [sys.executable, 'solver_subprocess.py', '--serve', '0',
+                 '--stats-only'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, cwd=script_dir
+            )
+            self.requests = self.proc.stdin
+        self.solves = 0
+        self.timed_out = False
+        # Guards the handoff between a finished solve and its timeout timer:
+        # once a solve is over the timer may no longer kill the worker, and
+        # once the timer has fired the solve's result is discarded
+        self._timeout_lock = threading.Lock()
+        self._solving = False
+
+    def _kill_on_timeout(self):
+        with self._timeout_lock:
+            if not self._solving:
+                return
+            self.timed_out = True
+            self.proc.kill()
+
+    def solve(self, payload):
+        """Solve a level (compact JSON bytes). Returns (success, total_moves,
+        total_matches), or None if the worker died or timed out (it is then
+        unusable)."""
+        self._solving = True
+        timer = threading.Timer(SOLVER_TIMEOUT_S, self._kill_on_timeout)
+        timer.start()
+        try:
+            self.requests.write(len(payload).to_bytes(4, 'little') + payload)
+            self.requests.flush()
+            header = self.proc.stdout.read(4)
+            if len(header) < 4:
+                return None
+            size = int.from_bytes(header, 'little')
+            if size != _SOLVER_STATS.size:
+                return None
+            body = self.proc.stdout.read(size)
+            if len(body) < size:
+                return None
+        except OSError:
+            return None
+        finally:
+            with self._timeout_lock:
+                self._solving = False
+            timer.cancel()
+        # The timer may have fired after the result was read but before the
+        # handoff above; the worker is dead then, so the result is not used
+        if self.timed_out:
+            return None
+        self.solves += 1
+        return _SOLVER_STATS.unpack(body)
+
+    def close(self):
+        """Ask the worker to exit (EOF on its level pipe) and reap it."""
+        try:
+            self.requests.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc.stdout.close()
+        self.proc.stderr.close()
+
+    def failure(self):
+        """Reap a worker that died, timed out or sent a bad result; returns
+        (returncode, stderr text)."""
+        # A still-running worker exits on EOF; one that doesn't is killed
+        try:
+            self.requests.close()
+        except OSError:
+            pass
+        # Without fd inheritance requests is the worker's stdin, now closed;
+        # communicate() must not try to flush it
+        self.proc.stdin = None
+        try:
+            _, stderr = self.proc.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            _, stderr = self.proc.communicate()
+        self.proc.stdout.close()
+        self.proc.stderr.close()
+        return self.proc.returncode, stderr[:500].decode('utf-8', 'replace')
+
+
+@atexit.register
+def _close_solver_workers():
+    with _idle_solver_workers_lock:
+        workers = _idle_solver_workers[:]
+        del _idle_solver_workers[:]
+    for worker in workers:
+        worker.close()
+
+
+def _solve_level_subprocess(payload):
+    """Solve a level (compact JSON bytes) in a solver_subprocess.py worker.
+    Returns an object with the SolveResult fields generate_levels reads, plus
+    solved: whether the solver ran to completion (vs. crash or timeout)."""
+    # Use subprocess-isolated solver to avoid CPython 3.11 memory corruption
+    # Level data goes over the worker's own length-framed binary pipe
+    # (reading it as text from stdin caused corruption on large JSON)
+    with _idle_solver_workers_lock:
+        worker = _idle_solver_workers.pop() if _idle_solver_workers else None
+    if worker is None:
+        worker = _SolverWorker(os.path.dirname(os.path.abspath(__file__)))
+    solver_output = worker.solve(payload)
+
+    class SubResult:
+        pass
+    result = SubResult()
+    result.move_sequence = []
+    if solver_output is not None:
+        if worker.solves < SOLVER_WORKER_MAX_SOLVES:
+            with _idle_solver_workers_lock:
+                _idle_solver_workers.append(worker)
+        else:
+            worker.close()
+        success, result.total_moves, result.total_matches = solver_output
+        result.success = bool(success)
+        # Not sent in --stats-only mode; generate_levels doesn't read them
+        result.failure_reason = ''
+        result.solve_time_ms = 0
+        result.solved = True
+    else:
+        returncode, stderr_msg = worker.failure()
+        result.success = False
+        stderr_msg = stderr_msg or 'no stderr'
+        if worker.timed_out:
+            result.failure_reason = 'Solver subprocess timed out'
+        elif returncode != 0:
+            result.failure_reason = f'Solver subprocess failed (rc={returncode}): {stderr_msg}'
+            print(f'    Solver subprocess failed: rc={returncode}, stderr={stderr_msg}', flush=True)
+        else:
+            # Exited cleanly, but without a well-formed result frame
+            result.failure_reason = f'Solver subprocess returned a bad result frame: {stderr_msg}'
+            print(f'    Solver subprocess returned a bad result frame, stderr={stderr_msg}', flush=True)
+        result.total_moves = 0
+        result.total_matches = 0
+        result.solved = False
+    return result
+
+
+def _solve_level_cached(level_data):
+    """_solve_level_subprocess, memoized on the level's exact JSON bytes.
+    Only results the solver actually produced are cached; subprocess crashes
+    and timeouts are retried on the next request."""
+    payload = _compact_json_bytes(level_data)
+    key = hashlib.blake2b(payload, digest_size=16).digest()
+    with _solve_cache_lock:
+        result = _solve_cache.get(key)
+        if result is not None:
+            _solve_cache.move_to_end(key)
+            return result
+    result = _solve_level_subprocess(payload)
+    if result.solved:
+        with _solve_cache_lock:
+            _solve_cache[key] = result
+            if len(_solve_cache) > SOLVE_CACHE_LIMIT:
+                _solve_cache.popitem(last=False)
+    return result
+
+
+def _generate_verified_levels(config, item_usage, level_start, level_end,
+                              max_attempts, workers):
+    """Generate and solver-verify levels in order, yielding
+    (level, attempt, level_data, solver_moves). solver_moves is None when
+    every attempt failed; level_data is then the last attempt.
+
+    Attempt 0 of upcoming levels is generated ahead of time, each from the
+    item usage the previous level leaves if its attempt 0 verifies, and up to
+    `workers` solver subprocesses run at once. When an attempt 0 fails, the
+    levels generated past it are discarded and the retries run serially, so
+    the output matches a fully serial run. item_usage is updated in place as
+    levels are accepted."""
+    window = deque()  # (level, level_data, usage_after, solve future)
+    next_level = level_start
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for level in range(level_start, level_end + 1):
+            # Free memory between levels to prevent CPython segfaults on complex levels
+            gc.collect()
+
+            while next_level <= level_end and len(window) < workers:
+                usage = dict(window[-1][2] if window else item_usage)
+                level_data = generate_level(next_level, config, usage)
+                # The tutorial's solution is known; it needs no solver run
+                future = (None if _is_tutorial_level(next_level, config)
+                          else pool.submit(_solve_level_cached, level_data))
+                window.append((next_level, level_data, usage, future))
+                next_level += 1
+
+            _, level_data, usage, future = window.popleft()
+            if future is None:
+                item_usage.update(usage)
+                yield level, 0, level_data, TUTORIAL_MOVES
+                continue
+            result = future.result()
+            if result.success:
+                item_usage.update(usage)
+                yield level, 0, level_data, result.total_moves
+                continue
+
+            # Levels generated past this one assumed it would verify
+            for *_, pending in window:
+                pending.cancel()
+            window.clear()
+            next_level = level + 1
+
+            # Retry with different seeds
+            attempt = 0
+            solver_moves = None
+            for attempt in range(1, max_attempts):
+                saved_usage = dict(item_usage)
+                level_data = generate_level(level, config, item_usage,
+                                            seed_offset=attempt * 1000)
+                result = _solve_level_cached(level_data)
+                if result.success:
+                    solver_moves = result.total_moves
+                    break
+                # Restore item usage for retry
+                item_usage.update(saved_usage)
+            yield level, attempt, level_data, solver_moves
+
+
+def generate_levels(config, output_dir, count=100, start_level=None, end_level=None,
+                    workers=None):
     """Generate levels for a world using reverse-play construction.
 
     If start_level/end_level are given, generates only that range (inclusive)
     without deleting other files. Otherwise generates all 1..count.
+    workers: solver subprocesses run at once (default os.cpu_count(); 1 = serial).
     """
+    if workers is None:
+        workers = os.cpu_count() or 1
     os.makedirs(output_dir, exist_ok=True)
 
     if start_level is not None and end_level is not None:
@@ -699,83 +1055,24 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
     print(f"\nGenerating {range_str} {config.world_id.title()} levels "
           f"(reverse-play V2{offset_str}) to: {output_dir}\n")
 
-    stats = []
+    stats = [None] * n_levels  # one stat line per level, in order
     errors = []
-    mechanic_histogram = {}
+    mechanic_histogram = Counter()
     move_comparisons = []  # (level, construction_moves, solver_moves)
 
     MAX_ATTEMPTS = 20
 
-    for level in range(level_start, level_end + 1):
-        # Free memory between levels to prevent CPython segfaults on complex levels
-        gc.collect()
-
-        # Try generating with solver verification; retry with different seeds
-        best_data = None
-        best_moves = None
-        for attempt in range(MAX_ATTEMPTS):
-            saved_usage = dict(item_usage)
-            level_data = generate_level(level, config, item_usage,
-                                        seed_offset=attempt * 1000)
-            # Use subprocess-isolated solver to avoid CPython 3.11 memory corruption
-            # Write level data to temp file (stdin piping causes corruption on large JSON)
-            try:
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                tmp_path = os.path.join(script_dir, f'_solver_tmp_{os.getpid()}.json')
-                with open(tmp_path, 'w') as tmp_f:
-                    json.dump(level_data, tmp_f, separators=(',', ':'))
-                proc = subprocess.run(
-                    [sys.executable, 'solver_subprocess.py', tmp_path, 'single'],
-                    capture_output=True, text=True,
-                    timeout=120, cwd=script_dir
-                )
-                if proc.returncode == 0 and proc.stdout.strip():
-                    solver_output = json.loads(proc.stdout.strip())
-                    class SubResult:
-                        pass
-                    result = SubResult()
-                    result.success = solver_output['success']
-                    result.total_moves = solver_output['total_moves']
-                    result.total_matches = solver_output['total_matches']
-                    result.failure_reason = solver_output.get('failure_reason', '')
-                    result.solve_time_ms = solver_output.get('solve_time_ms', 0)
-                    result.move_sequence = []
-                else:
-                    class SubResult:
-                        pass
-                    result = SubResult()
-                    result.success = False
-                    stderr_msg = proc.stderr[:500] if proc.stderr else 'no stderr'
-                    result.failure_reason = f'Solver subprocess failed (rc={proc.returncode}): {stderr_msg}'
-                    result.total_moves = 0
-                    if proc.returncode != 0:
-                        print(f'    Solver subprocess failed: rc={proc.returncode}, stderr={stderr_msg}', flush=True)
-                    result.total_matches = 0
-                    result.move_sequence = []
-            except subprocess.TimeoutExpired:
-                class SubResult:
-                    pass
-                result = SubResult()
-                result.success = False
-                result.failure_reason = 'Solver subprocess timed out'
-                result.total_moves = 0
-                result.total_matches = 0
-                result.move_sequence = []
-            finally:
-                try:
-                    os.remove(tmp_path)
-                except OSError:
-                    pass
-            if result.success:
-                best_data = level_data
-                best_moves = result.total_moves
-                break
-            # Restore item usage for retry
-            item_usage.update(saved_usage)
+    # Level files are written in the background so disk latency overlaps the
+    # next level's generation; each is serialized up front on this thread
+    writer = ThreadPoolExecutor(max_workers=LEVEL_WRITE_WORKERS)
+    writes = []
 
-        if best_data is None:
+    # Levels arrive in order, each verified by the solver (retried with
+    # different seeds on failure)
+    for level, attempt, best_data, best_moves in _generate_verified_levels(
+            config, item_usage, level_start, level_end, MAX_ATTEMPTS, workers):
+        if best_moves is None:
             # All attempts failed — use last generated level
-            best_data = level_data
             errors.append(f"L{level}: Solver failed after {MAX_ATTEMPTS} attempts")
         else:
             # Update thresholds using ensemble solver's best move count
@@ -792,11 +1089,19 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
 
         level_data = best_data
         filepath = os.path.join(output_dir, f"level_{level:03d}.json")
-        with open(filepath, "w", newline="\n") as f_out:
-            compact = _compact_level(level_data)
-            json.dump(compact, f_out, separators=(",", ":"))
+        writes.append(writer.submit(
+            _write_bytes, filepath, _compact_json_bytes(_compact_level(level_data))))
 
-        n_items = sum(len(c["initial_items"]) for c in level_data["containers"])
+        # Item, capacity and empty-container totals in one pass
+        n_items = 0
+        total_cap = 0
+        n_empty = 0
+        for c in level_data["containers"]:
+            held = len(c["initial_items"])
+            n_items += held
+            total_cap += c["slot_count"] * c["max_rows_per_slot"]
+            if held == 0:
+                n_empty += 1
         n_containers = len(level_data["containers"])
         thresh = level_data["star_move_thresholds"]
         timer = level_data["time_limit_seconds"]
@@ -813,11 +1118,12 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
         for c in level_data["containers"]:
             if c["slot_count"] >= 3:
                 max_row = c["max_rows_per_slot"]
-                for row in range(max_row):
-                    row_items = [None] * c["slot_count"]
-                    for item in c["initial_items"]:
-                        if item["row"] == row:
-                            row_items[item["slot"]] = item["id"]
+                # Lay the items out by row once rather than rescanning them per row
+                rows = [[None] * c["slot_count"] for _ in range(max_row)]
+                for item in c["initial_items"]:
+                    if 0 <= item["row"] < max_row:
+                        rows[item["row"]][item["slot"]] = item["id"]
+                for row, row_items in enumerate(rows):
                     if (all(ri is not None for ri in row_items)
                             and len(set(row_items)) == 1):
                         errors.append(
@@ -845,13 +1151,9 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
 
         # Static overlap detection (allow up to 10px edge overlap since grid
         # positions naturally have containers touching at edges)
-        for i in range(len(static_boxes)):
-            for j in range(i + 1, len(static_boxes)):
-                box_a, id_a = static_boxes[i]
-                box_b, id_b = static_boxes[j]
-                if _boxes_overlap(box_a, box_b, gap=-10):
-                    errors.append(
-                        f"L{level}: {id_a} and {id_b} overlap!")
+        for i, j in _overlapping_pairs([box for box, _ in static_boxes], gap=-10):
+            errors.append(
+                f"L{level}: {static_boxes[i][1]} and {static_boxes[j][1]} overlap!")
 
         # B&F path collision with static containers
         for tbox, bf_id in bf_boxes:
@@ -862,11 +1164,7 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
                     errors.append(
                         f"L{level}: B&F {bf_id} sweep collides with {s_id}")
 
-        total_cap = sum(c["slot_count"] * c["max_rows_per_slot"]
-                        for c in level_data["containers"])
         fill_pct = round(100 * n_items / total_cap) if total_cap > 0 else 0
-        n_empty = sum(1 for c in level_data["containers"]
-                      if len(c["initial_items"]) == 0)
         if n_empty > 0:
             errors.append(f"L{level}: {n_empty} empty container(s)")
 
@@ -886,48 +1184,60 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
             max_r = max(max_r, c["max_rows_per_slot"])
 
         # Track mechanic usage for histogram
-        for m in mechanics:
-            mechanic_histogram[m] = mechanic_histogram.get(m, 0) + 1
+        mechanic_histogram.update(mechanics)
 
         attempt_str = f" (attempt {attempt + 1})" if attempt > 0 else ""
         solver_str = f", solver={best_moves}m" if best_moves else ", UNSOLVED"
         construction_moves = level_data.get("construction_moves", 0)
         cmoves_str = f", construct={construction_moves}m" if construction_moves else ""
+        mech_str = f", [{', '.join(sorted(mechanics))}]" if mechanics else ""
         stat = (f"L{level:3d}: {n_containers:2d}c, {n_types:2d}t, "
                 f"{n_items:3d}i, {max_r}r, {fill_pct:3d}% fill, "
-                f"thresh={thresh}, timer={timer}s{solver_str}{cmoves_str}{attempt_str}")
-        if mechanics:
-            stat += f", [{', '.join(sorted(mechanics))}]"
-        stats.append(stat)
+                f"thresh={thresh}, timer={timer}s{solver_str}{cmoves_str}{attempt_str}"
+                f"{mech_str}")
+        stats[level - level_start] = stat
         print(stat)
 
         # Track construction vs solver comparison
         if construction_moves and best_moves:
             move_comparisons.append((level, construction_moves, best_moves))
 
-    # Summary
-    print(f"\n{'=' * 60}")
-    min_used = min(item_usage.values())
-    max_used = max(item_usage.values())
-    unused = [item for item in all_items if item_usage[item] == 0]
-    print(f"Item usage: min={min_used}, max={max_used}")
+    # Surface any write error before reporting
+    for w in writes:
+        w.result()
+    writer.shutdown()
+
+    # Summary, written to stdout in one go once assembled
+    report = [f"\n{'=' * 60}"]
+    # Usage range and unused items in one pass (item_usage is keyed in
+    # all_items order)
+    min_used = max_used = item_usage[all_items[0]]
+    unused = []
+    for item, used in item_usage.items():
+        if used < min_used:
+            min_used = used
+        elif used > max_used:
+            max_used = used
+        if used == 0:
+            unused.append(item)
+    report.append(f"Item usage: min={min_used}, max={max_used}")
     if unused:
-        print(f"UNUSED: {unused}")
+        report.append(f"UNUSED: {unused}")
         errors.append(f"Unused items: {unused}")
     else:
-        print(f"All {len(all_items)} items used!")
+        report.append(f"All {len(all_items)} items used!")
 
-    # Mechanic histogram
-    print(f"\nMechanic histogram (levels using each):")
-    for mech in sorted(mechanic_histogram.keys()):
-        n_levels = level_end - level_start + 1
-        print(f"  {mech}: {mechanic_histogram[mech]}/{n_levels}")
+    # Mechanic histogram (its rows are shared with the summary file)
+    histogram_rows = [f"  {mech}: {hits}/{n_levels}"
+                      for mech, hits in sorted(mechanic_histogram.items())]
+    report.append(f"\nMechanic histogram (levels using each):")
+    report.extend(histogram_rows)
 
     # Construction vs Solver comparison
     if move_comparisons:
-        print(f"\nConstruction vs Solver moves:")
-        print(f"  {'Level':>5}  {'Construct':>9}  {'Solver':>6}  {'Diff':>5}  {'%':>6}")
-        print(f"  {'-'*5}  {'-'*9}  {'-'*6}  {'-'*5}  {'-'*6}")
+        report.append(f"\nConstruction vs Solver moves:")
+        report.append(f"  {'Level':>5}  {'Construct':>9}  {'Solver':>6}  {'Diff':>5}  {'%':>6}")
+        report.append(f"  {'-'*5}  {'-'*9}  {'-'*6}  {'-'*5}  {'-'*6}")
         total_construct = 0
         total_solver = 0
         solver_better = 0
@@ -935,8 +1245,8 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
         solver_equal = 0
         for lvl, cm, sm in move_comparisons:
             diff = sm - cm
-            pct = (diff / cm * 100) if cm > 0 else 0
-            print(f"  L{lvl:>3}  {cm:>9}  {sm:>6}  {diff:>+5}  {pct:>+5.1f}%")
+            pct = diff / cm * 100  # only recorded with construction_moves > 0
+            report.append(_COMPARISON_ROW(lvl, cm, sm, diff, pct))
             total_construct += cm
             total_solver += sm
             if sm < cm:
@@ -945,38 +1255,39 @@ def generate_levels(config, output_dir, count=100, start_level=None, end_level=N
                 solver_worse += 1
             else:
                 solver_equal += 1
-        print(f"\n  Summary: solver better={solver_better}, equal={solver_equal}, worse={solver_worse}")
+        report.append(f"\n  Summary: solver better={solver_better}, equal={solver_equal}, worse={solver_worse}")
         avg_diff = (total_solver - total_construct) / len(move_comparisons)
-        print(f"  Totals: construct={total_construct}, solver={total_solver}, "
-              f"avg diff={avg_diff:+.1f} moves/level")
+        report.append(f"  Totals: construct={total_construct}, solver={total_solver}, "
+                      f"avg diff={avg_diff:+.1f} moves/level")
 
+    # Error rows are shared with the summary file too
+    error_rows = [f"  {e}" for e in errors]
     if errors:
-        print(f"\nERRORS ({len(errors)}):")
-        for e in errors:
-            print(f"  {e}")
+        report.append(f"\nERRORS ({len(errors)}):")
+        report.extend(error_rows)
     else:
-        print("\nNo errors!")
+        report.append("\nNo errors!")
 
     range_str = f"L{level_start}-L{level_end}" if start_level is not None else f"all {n_levels}"
-    print(f"\nDone! Generated {n_levels} levels ({range_str}).")
+    report.append(f"\nDone! Generated {n_levels} levels ({range_str}).")
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
 
     # Summary file
     summary_path = os.path.join(output_dir, "..",
                                 f"{config.world_id}_levels_summary.txt")
-    with open(summary_path, "w") as f_out:
-        f_out.write(f"{config.world_id.title()} Levels Summary\n")
-        f_out.write("=" * 80 + "\n\n")
-        for s in stats:
-            f_out.write(s + "\n")
-        f_out.write(f"\nItem usage: min={min_used}, max={max_used}\n")
-        if unused:
-            f_out.write(f"UNUSED: {unused}\n")
-        f_out.write(f"\nMechanic histogram:\n")
-        for mech in sorted(mechanic_histogram.keys()):
-            f_out.write(f"  {mech}: {mechanic_histogram[mech]}/{n_levels}\n")
-        if errors:
-            f_out.write(f"\nErrors:\n")
-            for e in errors:
-                f_out.write(f"  {e}\n")
+    summary = [f"{config.world_id.title()} Levels Summary",
+               "=" * 80 + "\n"]
+    summary.extend(stats)
+    summary.append(f"\nItem usage: min={min_used}, max={max_used}")
+    if unused:
+        summary.append(f"UNUSED: {unused}")
+    summary.append(f"\nMechanic histogram:")
+    summary.extend(histogram_rows)
+    if errors:
+        summary.append(f"\nErrors:")
+        summary.extend(error_rows)
+    with open(summary_path, "w", encoding="utf-8") as f_out:
+        f_out.write("\n".join(summary) + "\n")
 
     return errors
@@ -1,32 +1,125 @@
 #!/usr/bin/env python3
 """Subprocess solver wrapper - reads level JSON from file arg or stdin, outputs result JSON to stdout.
-Uses only solve_level (single strategy) to minimize memory usage and avoid CPython segfaults."""
+Uses only solve_level (single strategy) to minimize memory usage and avoid CPython segfaults.
+
+The result is framed as a 4-byte little-endian length followed by that many
+bytes of compact JSON, so the parent can check it arrived whole.
+
+The level can also come from an inherited pipe: pass --fd FD instead of a
+path. With --serve FD it runs as a persistent worker: each request on that
+fd is a level's JSON, framed the same way, and gets one framed result on
+stdout, until the fd reaches EOF. Inheriting a pipe fd is POSIX-only; on
+Windows use --serve 0 to take the framed requests on stdin (the generator
+does this), and a path or stdin for one-shot solves.
+
+With --stats-only the frame body is instead the STATS_FORMAT struct
+(success, total_moves, total_matches): the fields the generator reads."""
 import sys
+import os
 import json
 import gc
+import struct
+
+# orjson is an optional speedup; without it the stdlib json module is used.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Disable GC to reduce memory corruption chance
 gc.disable()
 
 from level_solver import solve_level
 
-# Read level data from file path argument (preferred) or stdin fallback
-if len(sys.argv) >= 2 and sys.argv[1] != 'single':
-    with open(sys.argv[1], 'r') as f:
-        level_data = json.load(f)
-elif len(sys.argv) >= 3 and sys.argv[1] == 'single':
-    # Edge case: 'single' as first arg, file path missing
-    level_data = json.loads(sys.stdin.read())
+# Move everything imported so far to the permanent generation, so the
+# between-level collections in --serve mode only scan solver garbage
+gc.freeze()
+
+if orjson is not None:
+    loads = orjson.loads
+    dumps_compact = orjson.dumps
+else:
+    loads = json.loads
+
+    def dumps_compact(data):
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+# success (0/1), total_moves, total_matches; little-endian, unpadded
+STATS_FORMAT = '<BII'
+
+
+def result_frame(result, stats_only=False):
+    """Frame a SolveResult: its reported fields as JSON, or with stats_only
+    just the STATS_FORMAT struct."""
+    if stats_only:
+        payload = struct.pack(STATS_FORMAT, result.success,
+                              result.total_moves, result.total_matches)
+        return len(payload).to_bytes(4, 'little') + payload
+    output = {
+        "success": result.success,
+        "total_moves": result.total_moves,
+        "total_matches": result.total_matches,
+        "failure_reason": result.failure_reason,
+        "solve_time_ms": result.solve_time_ms,
+    }
+    payload = dumps_compact(output)
+    return len(payload).to_bytes(4, 'little') + payload
+
+
+# Frames go straight through the raw fds; sys.stdin/sys.stdout buffering
+# buys nothing for one small message at a time
+
+def read_exact(fd, n):
+    """Read n bytes from fd (fewer only at EOF)."""
+    data = b''
+    while len(data) < n:
+        chunk = os.read(fd, n - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def write_all(data):
+    """Write all of data to stdout."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(1, view):]
+
+
+def serve(fd, stats_only):
+    """Solve framed levels read from fd until it closes."""
+    while True:
+        header = read_exact(fd, 4)
+        if len(header) < 4:
+            break
+        level_data = loads(read_exact(fd, int.from_bytes(header, 'little')))
+        write_all(result_frame(solve_level(level_data), stats_only))
+        # GC stays off while solving; reclaim cycles between levels instead
+        del level_data
+        gc.collect()
+
+
+stats_only = '--stats-only' in sys.argv
+if stats_only:
+    sys.argv.remove('--stats-only')
+
+if len(sys.argv) >= 3 and sys.argv[1] == '--serve':
+    serve(int(sys.argv[2]), stats_only)
 else:
-    level_data = json.loads(sys.stdin.read())
-result = solve_level(level_data)
-
-output = {
-    "success": result.success,
-    "total_moves": result.total_moves,
-    "total_matches": result.total_matches,
-    "failure_reason": result.failure_reason,
-    "solve_time_ms": result.solve_time_ms,
-}
-sys.stdout.write(json.dumps(output))
-sys.stdout.flush()
+    # Read level data from an inherited pipe fd or file path argument
+    # (preferred), or stdin fallback
+    if len(sys.argv) >= 3 and sys.argv[1] == '--fd':
+        with os.fdopen(int(sys.argv[2]), 'rb') as f:
+            level_data = loads(f.read())
+    elif len(sys.argv) >= 2 and sys.argv[1] != 'single':
+        with open(sys.argv[1], 'rb') as f:
+            level_data = loads(f.read())
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'single':
+        # Edge case: 'single' as first arg, file path missing
+        level_data = loads(sys.stdin.buffer.read())
+    else:
+        level_data = loads(sys.stdin.buffer.read())
+
+    write_all(result_frame(solve_level(level_data), stats_only))